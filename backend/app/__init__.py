@@ -1,16 +1,50 @@
+from importlib import import_module
 from flask import Flask
 from flask_cors import CORS
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 
 from .config import Config
 from .database import db
+from .cache import init_response_cache
+from .identity import init_identity
+from .engine import build_bind_options, build_engine_options, init_engine
+from .replica import init_replicas, replica_binds
+from .metrics import init_metrics
+from .diagnostics import init_diagnostics
+from .compression import init_compression
+from .admission import init_admission
+from .events import init_events
+from .json_provider import FastJSONProvider
 from . import models  # da migracije vide modele
 
+# Profili podizanja aplikacije:
+#  - "full" (podrazumevano: flask CLI, razvoj, bench): Flask-Migrate/Alembic + CLI komande
+#  - "serve" (gunicorn worker): bez migracionog alata i CLI-ja; teški uvozi (NumPy) tek pri prvoj upotrebi
+#  - "preload" (gunicorn --preload): kao serve, ali se teški uvozi učitaju unapred u masteru,
+#    pa ih fork-ovani worker-i dele; DB konekcije se ne otvaraju, a engine.py ih posle fork-a odbacuje
+#    gunicorn --preload -w 3 -b 0.0.0.0:5000 "app:create_app('preload')"
+PROFILES = ("full", "serve", "preload")
 
-def create_app():
+# (modul, blueprint, url_prefix) – moduli se uvoze tek u create_app
+BLUEPRINTS = (
+    ("auth", "bp", "/api/auth"),
+    ("categories", "bp_categories", "/api/categories"),
+    ("transactions", "bp_tx", "/api/transactions"),
+    ("budgets", "bp_budgets", "/api/budgets"),
+    ("overview", "bp_overview", "/api/overview"),
+    ("forecast", "bp_forecast", "/api/forecast"),
+    ("sync", "bp_sync", "/api/sync"),
+    ("events", "bp_events", "/api/events"),
+)
+
+
+def create_app(profile: str = "full"):
+    if profile not in PROFILES:
+        raise ValueError(f"Nepoznat profil: {profile} (očekivano: {', '.join(PROFILES)})")
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.config["BOOT_PROFILE"] = profile
+    app.json = FastJSONProvider(app)  # orjson kad je dostupan (FAST_JSON=0 isključuje)
 
     # CORS – dozvoli Authorization header za frontend dev origin
     CORS(
@@ -20,29 +54,44 @@ def create_app():
             "http://127.0.0.1:5173",
         ]}},
         supports_credentials=False,  
-        allow_headers=["Authorization", "Content-Type"],
-        expose_headers=["Authorization", "Content-Type"],
+        allow_headers=["Authorization", "Content-Type", "If-None-Match", "Last-Event-ID"],
+        expose_headers=["Authorization", "Content-Type", "ETag", "X-Query-Summary"],
     )
 
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", build_engine_options(app.config))
+    app.config["SQLALCHEMY_BINDS"] = build_bind_options(app.config, {
+        **(app.config.get("SQLALCHEMY_BINDS") or {}),
+        **replica_binds(app.config["DATABASE_REPLICA_URLS"]),
+    })
     db.init_app(app)
-    Migrate(app, db)
-    JWTManager(app)
+    init_engine(app)
+    init_replicas(app, db)
+    if profile == "full":
+        from flask_migrate import Migrate  # Alembic je ~200 ms uvoza – serving proces ga ne treba
+        Migrate(app, db)
+    jwt = JWTManager(app)
+    init_identity(app, jwt)
+    init_metrics(app)  # pre admission-a: before_request redom registracije, pa se i 429/503 mere
+    init_admission(app)
+    init_response_cache(app)
+    init_diagnostics(app)
+    init_compression(app)
+    init_events(app)
 
     @app.get("/api/health")
     def health():
         return {"status": "ok"}
 
     # Blueprints
-    from .auth import bp as auth_bp
-    from .categories import bp_categories
-    from .transactions import bp_tx
-    from .budgets import bp_budgets
-    from .overview import bp_overview
-
-    app.register_blueprint(auth_bp, url_prefix="/api/auth")
-    app.register_blueprint(bp_categories, url_prefix="/api/categories")
-    app.register_blueprint(bp_tx, url_prefix="/api/transactions")
-    app.register_blueprint(bp_budgets, url_prefix="/api/budgets")
-    app.register_blueprint(bp_overview, url_prefix="/api/overview")
+    for module, attr, prefix in BLUEPRINTS:
+        bp = getattr(import_module(f".{module}", __name__), attr)
+        app.register_blueprint(bp, url_prefix=prefix)
+
+    if profile == "full":
+        from .cli import register_cli
+        register_cli(app)
+    elif profile == "preload":
+        from .forecast import load_numpy
+        load_numpy()
 
     return app
@@ -0,0 +1,196 @@
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from flask import current_app, g, request
+from flask_jwt_extended import verify_jwt_in_request
+from .identity import current_user_id
+from .slots import FileSlots
+
+# Admission control ispred svih /api ruta:
+#  1) globalni limit zahteva u obradi (zbir preko svih worker-a) -> 503 + Retry-After
+#  2) token bucket po korisniku (JWT) ili po IP adresi (anonimni zahtevi, npr. login) -> 429 + Retry-After
+# Ruta troši onoliko tokena koliko joj je dodeljeno sa @admission_cost(n) (podrazumevano 1),
+# pa export/import i login (scrypt) brže troše budžet od jeftinih GET ruta.
+# Stanje dele svi gunicorn worker-i na mašini: bucket-i u lokalnim SQLite fajlovima, limit
+# u obradi kao flock mesta (vidi SQLiteAdmission).
+
+EXEMPT_PATHS = ("/api/health", "/api/metrics")
+# dugi SSE stream (pod gevent-om do SSE_MAX_DURATION) plaća bucket, ali ne drži mesto u obradi –
+# inače bi ADMISSION_MAX_INFLIGHT otvorenih dashboard-a odbijalo sve ostale zahteve sa 503
+STREAM_PATHS = ("/api/events/",)
+
+
+def admission_cost(cost: int):
+    """Cena rute u tokenima. Ide odmah ispod @bp.get/@bp.post (spolja od @jwt_required)."""
+    def decorator(view):
+        view.admission_cost = cost
+        return view
+    return decorator
+
+
+# — backend-i stanja —
+
+class MemoryAdmission:
+    """Stanje u memoriji procesa – za jedan worker / razvoj."""
+
+    def __init__(self, max_inflight=0):
+        self.max_inflight = max_inflight
+        self._lock = threading.Lock()
+        self._buckets = {}  # ključ -> (tokeni, vreme)
+        self._inflight = 0
+
+    def take(self, key, cost, capacity, rate, now):
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens < cost:
+                self._buckets[key] = (tokens, now)
+                return False, tokens
+            self._buckets[key] = (tokens - cost, now)
+            return True, tokens - cost
+
+    def enter(self):
+        """Token mesta u obradi ili None ako je limit dostignut."""
+        with self._lock:
+            if self._inflight >= self.max_inflight:
+                return None
+            self._inflight += 1
+            return True
+
+    def leave(self, _token):
+        with self._lock:
+            self._inflight -= 1
+
+
+class SQLiteAdmission:
+    """Bucket-i u SQLite fajlovima (shard po ključu), zahtevi u obradi kao flock mesta (slots.py).
+
+    Hot path je jedan UPSERT u shard-u klijenta: worker-i se na write lock-u sreću samo kad
+    im klijenti padnu u isti shard. Mesta u obradi ne pišu u bazu, a kernel ih otpušta kad
+    worker umre – restart (i isti ppid u kontejneru) ne ostavlja zaostale brojače.
+    """
+
+    PRUNE_EVERY = 1000  # svakih N take() poziva (po shard-u) obriši bucket-e koji su se ionako napunili
+
+    def __init__(self, path, shards=8, max_inflight=0):
+        root, ext = os.path.splitext(path)
+        self.paths = [path] if shards <= 1 else [f"{root}-{i}{ext}" for i in range(shards)]
+        self._calls = [0] * len(self.paths)
+        self._local = threading.local()
+        for i in range(len(self.paths)):
+            conn = self._conn(i)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS admission_bucket ("
+                " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            conn.close()  # gunicorn --preload: master ne ostavlja otvorenu konekciju worker-ima
+        self._local.conns = None
+        self.slots = FileSlots(f"{root}-slots", max_inflight) if max_inflight else None
+
+    def _conn(self, shard):
+        # konekcije po (procesu, niti) – sqlite3 konekcije se ne dele posle fork-a
+        conns = getattr(self._local, "conns", None)
+        if conns is None or self._local.pid != os.getpid():
+            conns = self._local.conns = [None] * len(self.paths)
+            self._local.pid = os.getpid()
+        if conns[shard] is None:
+            conn = sqlite3.connect(self.paths[shard], timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # stanje je prolazno – trajnost nije potrebna
+            conns[shard] = conn
+        return conns[shard]
+
+    def take(self, key, cost, capacity, rate, now):
+        # jedan atomski UPSERT: dopuni bucket za proteklo vreme i skini cost ako ima dovoljno
+        shard = zlib.crc32(key.encode()) % len(self.paths)
+        conn = self._conn(shard)
+        self._calls[shard] += 1
+        if self._calls[shard] % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM admission_bucket WHERE updated < ?", (now - capacity / rate,))
+        refill = "MIN(:cap, tokens + (:now - updated) * :rate)"
+        row = conn.execute(
+            "INSERT INTO admission_bucket (key, tokens, updated) VALUES (:key, :cap - :cost, :now) "
+            f"ON CONFLICT(key) DO UPDATE SET tokens = {refill} - :cost, updated = :now "
+            f"WHERE {refill} >= :cost RETURNING tokens",
+            {"key": key, "cap": capacity, "cost": cost, "now": now, "rate": rate},
+        ).fetchone()
+        if row is not None:
+            return True, row[0]
+        tokens, updated = conn.execute(
+            "SELECT tokens, updated FROM admission_bucket WHERE key = ?", (key,)
+        ).fetchone()
+        return False, min(capacity, tokens + (now - updated) * rate)
+
+    def enter(self):
+        return self.slots.acquire() if self.slots is not None else True
+
+    def leave(self, token):
+        if self.slots is not None:
+            self.slots.release(token)
+
+
+def _client_key():
+    # korisnik iz validnog JWT-a, razrešen kao u rutama (id ili email -> isti user_id, jedan bucket);
+    # inače (nema tokena, istekao, neispravan, nepoznat korisnik) IP adresa
+    try:
+        verify_jwt_in_request(optional=True)
+        uid = current_user_id()
+    except Exception:
+        uid = None
+    return f"u:{uid}" if uid else f"ip:{request.remote_addr}"
+
+
+def _reject(status, message, retry_after):
+    return {"message": message}, status, {"Retry-After": str(max(1, math.ceil(retry_after)))}
+
+
+def init_admission(app):
+    """ADMISSION_BACKEND: 'sqlite' (fajl po gunicorn masteru), 'sqlite:///putanja.db', 'memory' ili 'none'."""
+    spec = app.config["ADMISSION_BACKEND"]
+    max_inflight = app.config["ADMISSION_MAX_INFLIGHT"]
+    if spec == "none":
+        return
+    if spec == "memory":
+        store = MemoryAdmission(max_inflight)
+    elif spec == "sqlite" or spec.startswith("sqlite:///"):
+        path = spec[len("sqlite:///"):] if spec != "sqlite" else os.path.join(
+            # worker-i istog gunicorn mastera imaju isti ppid -> isti fajlovi
+            tempfile.gettempdir(), f"mojbudzet-admission-{os.getppid()}.db"
+        )
+        store = SQLiteAdmission(path, app.config["ADMISSION_SHARDS"], max_inflight)
+    else:
+        raise ValueError(f"Nepoznat ADMISSION_BACKEND: {spec}")
+    app.extensions["admission"] = store
+
+    @app.before_request
+    def _admit():
+        if request.method == "OPTIONS" or request.path in EXEMPT_PATHS:
+            return None
+        cfg = current_app.config
+
+        # 1) globalni limit – odbij odmah, pre nego što zahtev zauzme worker na duže
+        if cfg["ADMISSION_MAX_INFLIGHT"] and request.path not in STREAM_PATHS:
+            token = store.enter()
+            if token is None:
+                return _reject(503, "Server je trenutno preopterećen, pokušajte ponovo", 1)
+            g._admission_token = token
+
+        # 2) token bucket po klijentu
+        view = current_app.view_functions.get(request.endpoint)
+        capacity, rate = cfg["RATE_LIMIT_CAPACITY"], max(cfg["RATE_LIMIT_REFILL"], 1e-6)
+        cost = min(getattr(view, "admission_cost", 1), capacity)
+        ok, tokens = store.take(_client_key(), cost, capacity, rate, time.time())
+        if not ok:
+            return _reject(429, "Previše zahteva, pokušajte ponovo kasnije", (cost - tokens) / rate)
+        return None
+
+    @app.teardown_request
+    def _release(_exc):
+        # teardown stiže i posle strimovanog odgovora i posle izuzetka
+        token = g.pop("_admission_token", None)
+        if token is not None:
+            store.leave(token)
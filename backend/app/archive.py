@@ -0,0 +1,117 @@
+from datetime import datetime
+from sqlalchemy import Column, delete, func, insert, select, text, union_all
+from sqlalchemy.sql import visitors
+from .database import db
+from .models import Transaction, TransactionArchive, User
+
+# Hot/cold podela transakcija: "flask archive-transactions" premešta transakcije starije od
+# horizonta (ARCHIVE_HORIZON_MONTHS) iz transaction u transaction_archive. Zbirovi po
+# (mesec, kategorija) ostaju u monthly_category_total, pa overview/budgets/summary rade kao i pre;
+# upiti nad sirovim redovima (lista, export, dnevne serije, sync, rollup rebuild/verify) dodaju
+# arhivu preko UNION ALL samo kada traženi opseg zalazi ispod granice arhive korisnika.
+
+_HOT = Transaction.__table__
+_COLD = TransactionArchive.__table__
+COLUMNS = [c.name for c in _COLD.c]
+
+
+def to_archive(stmt):
+    """Isti upit nad transaction_archive (kolone transaction -> kolone arhive, istog imena)."""
+    def replace(el):
+        if isinstance(el, Column) and el.table is _HOT:
+            return _COLD.c[el.name]
+        if el is _HOT:
+            return _COLD
+        return None
+    return visitors.replacement_traverse(stmt, {}, replace)
+
+
+def archive_boundary(uid: int):
+    """Datum najnovije arhivirane transakcije korisnika (None ako nema arhive) – jedan indeksni lookup."""
+    return db.session.execute(
+        select(func.max(TransactionArchive.date)).where(TransactionArchive.user_id == uid)
+    ).scalar()
+
+
+def spans_archive(uid: int, start: datetime | None = None) -> bool:
+    boundary = archive_boundary(uid)
+    return boundary is not None and (start is None or start <= boundary)
+
+
+def union_archive(stmt, uid: int, start: datetime | None = None):
+    """select nad transaction -> UNION ALL sa arhivom ako opseg (od start) zalazi u nju.
+
+    ORDER BY/LIMIT dodaje pozivalac preko stmt.selected_columns (radi i za običan i za složen upit).
+    """
+    if not spans_archive(uid, start):
+        return stmt
+    return union_all(stmt, to_archive(stmt))
+
+
+# — premeštanje —
+
+def archive_transactions(cutoff: datetime, batch: int = 10000, dry_run: bool = False, log=print) -> int:
+    """Premešta transakcije sa date < cutoff u arhivu, po korisniku i u paketima (commit po paketu)."""
+    moved = 0
+    for uid in db.session.execute(select(User.id).order_by(User.id)).scalars().all():
+        if dry_run:
+            n = db.session.execute(
+                select(func.count()).select_from(_HOT).where(_HOT.c.user_id == uid, _HOT.c.date < cutoff)
+            ).scalar()
+            moved += n
+            if n:
+                log(f"korisnik {uid}: {n} transakcija za arhivu")
+            continue
+        while True:
+            # indeks (user_id, date, id) – bez skeniranja cele tabele po paketu
+            ids = db.session.execute(
+                select(_HOT.c.id).where(_HOT.c.user_id == uid, _HOT.c.date < cutoff)
+                .order_by(_HOT.c.date, _HOT.c.id).limit(batch)
+            ).scalars().all()
+            if not ids:
+                break
+            db.session.execute(
+                insert(_COLD).from_select(COLUMNS, select(*(_HOT.c[n] for n in COLUMNS)).where(_HOT.c.id.in_(ids)))
+            )
+            db.session.execute(delete(_HOT).where(_HOT.c.id.in_(ids)))  # FTS trigeri brišu i iz indeksa
+            db.session.commit()
+            moved += len(ids)
+            log(f"korisnik {uid}: arhivirano {len(ids)} (ukupno {moved})")
+    return moved
+
+
+# — održavanje i izveštaj o prostoru —
+
+def storage_report() -> dict:
+    """Bajtovi po tabeli/indeksu (SQLite dbstat ili PostgreSQL pg_*_size) + '__total__'."""
+    conn = db.session.connection()
+    if conn.dialect.name == "sqlite":
+        page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+        used = conn.exec_driver_sql("PRAGMA page_count").scalar() - conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        out = {"__total__": conn.exec_driver_sql("PRAGMA page_count").scalar() * page_size, "__used__": used * page_size}
+        try:  # dbstat postoji samo ako je SQLite preveden sa SQLITE_ENABLE_DBSTAT_VTAB
+            for name, size in conn.exec_driver_sql("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"):
+                out[name] = size
+        except Exception:
+            pass
+        return out
+    if conn.dialect.name == "postgresql":
+        out = {"__total__": conn.execute(text("SELECT pg_database_size(current_database())")).scalar()}
+        for name in ("transaction", "transaction_archive", "monthly_category_total"):
+            out[name] = conn.execute(text("SELECT pg_total_relation_size(:t)"), {"t": name}).scalar()
+        return out
+    return {}
+
+
+def analyze_vacuum():
+    """ANALYZE (nova statistika za planer) pa VACUUM (vraća oslobođene stranice) – van transakcije."""
+    db.session.close()
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql('VACUUM ANALYZE "transaction"')
+            conn.exec_driver_sql("VACUUM ANALYZE transaction_archive")
+            return
+        conn.exec_driver_sql("ANALYZE")
+        conn.exec_driver_sql("VACUUM")
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")  # WAL fajl posle VACUUM-a je veličine baze
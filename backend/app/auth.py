@@ -1,11 +1,20 @@
 from flask import Blueprint, request
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required
 from .database import db
+from .identity import current_user_id
 from .models import User, Category
+from .passwords import HashPoolBusy, hash_password, needs_rehash
+from .admission import admission_cost
+from .replica import mark_write
 import re
 
 bp = Blueprint("auth", __name__)
 
+@bp.errorhandler(HashPoolBusy)
+def hash_pool_busy(_e):
+    # pool za heširanje je pun – odbij odmah umesto da worker čeka
+    return {"message": "Server je trenutno preopterećen, pokušajte ponovo"}, 503, {"Retry-After": "1"}
+
 def valid_password(p: str) -> bool:
     if not p or len(p) < 8:
         return False
@@ -15,6 +24,7 @@ def valid_password(p: str) -> bool:
     return bool(has_upper and has_lower and has_num_or_sym)
 
 @bp.post("/register")
+@admission_cost(10)  # scrypt + upis
 def register():
     data = request.get_json() or {}
     email = (data.get("email") or "").strip()
@@ -44,12 +54,14 @@ def register():
     ]
     for n, t in defaults:
         db.session.add(Category(user_id=user.id, name=n, type=t))
+    mark_write(user.id)  # novi korisnik još ne postoji na replikama
     db.session.commit()
 
     token = create_access_token(identity=str(user.id))
     return {"access_token": token, "user": {"id": user.id, "email": user.email, "name": user.name}}, 201
 
 @bp.post("/login")
+@admission_cost(5)  # scrypt; ujedno koči pogađanje lozinke po IP-u
 def login():
     data = request.get_json() or {}
     email = (data.get("email") or "").strip()
@@ -58,12 +70,18 @@ def login():
     if not user or not user.check_password(password):
         return {"message": "pogrešan email ili lozinka"}, 401
 
+    # parametri heširanja su promenjeni -> tiho prepiši hash dok imamo lozinku
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(password)
+        db.session.commit()
+
     token = create_access_token(identity=str(user.id))
     return {"access_token": token, "user": {"id": user.id, "email": user.email, "name": user.name}}, 200
 
 @bp.get("/me")
 @jwt_required()
 def me():
-    uid = int(get_jwt_identity())
-    u = User.query.get(uid)
+    u = db.session.get(User, current_user_id())
+    if not u:
+        return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
     return {"id": u.id, "email": u.email, "name": u.name}
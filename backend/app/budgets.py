@@ -1,67 +1,40 @@
 from datetime import datetime
-from calendar import monthrange
 from flask import Blueprint, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func
+from flask_jwt_extended import jwt_required
+from sqlalchemy import and_, func, select
 from .database import db
-from .models import Budget, Category, Transaction, User
+from .identity import current_user_id
+from .models import Budget, Category, MonthlyCategoryTotal
+from .utils import from_cents, month_range, to_cents
+from .cache import bump_data_version, cached_response
+from .sync import record_deletion
 
 bp_budgets = Blueprint("budgets", __name__)  # registruje se u __init__.py sa url_prefix="/api/budgets"
 
-# — helpers —
-def _get_current_user_id():
-    ident = get_jwt_identity()
-    if isinstance(ident, int):
-        return ident
-    if isinstance(ident, dict):
-        if isinstance(ident.get("id"), int):
-            return ident["id"]
-        sub = ident.get("sub")
-        if isinstance(sub, int):
-            return sub
-        if isinstance(sub, str) and "@" in sub:
-            u = User.query.filter_by(email=sub).first()
-            return u.id if u else None
-    if isinstance(ident, str):
-        try:
-            return int(ident)
-        except ValueError:
-            if "@" in ident:
-                u = User.query.filter_by(email=ident).first()
-                return u.id if u else None
-    return None
-
-def _month_range(yyyy_mm: str):
-    # yyyy_mm -> (start_datetime, end_datetime_inclusive)
-    try:
-        y, m = map(int, yyyy_mm.split("-"))
-        start = datetime(y, m, 1, 0, 0, 0)
-        last_day = monthrange(y, m)[1]
-        end = datetime(y, m, last_day, 23, 59, 59, 999000)
-        return start, end
-    except Exception:
-        return None, None
-
 # — CRUD budgeta —
 
 @bp_budgets.get("/")
 @jwt_required()
 def list_budgets():
-    uid = _get_current_user_id()
+    uid = current_user_id()
     if not uid:
         return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
-    items = Budget.query.filter_by(user_id=uid).order_by(Budget.month.desc()).all()
+    items = db.session.execute(
+        select(Budget.id, Budget.category_id, Budget.month, Budget.limit_cents)
+        .where(Budget.user_id == uid)
+        .order_by(Budget.month.desc())
+    )
     return [{
         "id": b.id,
         "category_id": b.category_id,
         "month": b.month,               # 'YYYY-MM'
-        "limit_amount": float(b.limit_amount),
+        "limit_amount": from_cents(b.limit_cents),
     } for b in items], 200
 
 @bp_budgets.post("/")
 @jwt_required()
 def create_budget():
-    uid = _get_current_user_id()
+    uid = current_user_id()
     if not uid:
         return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
 
@@ -69,10 +42,10 @@ def create_budget():
     month = (data.get("month") or "").strip()   # 'YYYY-MM'
     try:
         cat_id = int(data.get("category_id"))
-        limit_amount = float(data.get("limit_amount"))
+        limit_cents = to_cents(data.get("limit_amount"))
     except (TypeError, ValueError):
         return {"message": "category_id (int) i limit_amount (broj) su obavezni"}, 400
-    if limit_amount < 0:
+    if limit_cents < 0:
         return {"message": "limit_amount mora biti >= 0"}, 400
     if len(month) != 7 or "-" not in month:
         return {"message": "month mora biti formata YYYY-MM"}, 400
@@ -85,16 +58,16 @@ def create_budget():
     if exists:
         return {"message": "Budžet za tu kategoriju i mesec već postoji"}, 409
 
-    b = Budget(user_id=uid, category_id=cat_id, month=month, limit_amount=limit_amount)
+    b = Budget(user_id=uid, category_id=cat_id, month=month, limit_cents=limit_cents, seq=bump_data_version(uid))
     db.session.add(b)
     db.session.commit()
-    return {"id": b.id, "category_id": b.category_id, "month": b.month, "limit_amount": float(b.limit_amount)}, 201
+    return {"id": b.id, "category_id": b.category_id, "month": b.month, "limit_amount": from_cents(b.limit_cents)}, 201
 
 @bp_budgets.put("/<int:bid>")
 @bp_budgets.patch("/<int:bid>")
 @jwt_required()
 def update_budget(bid):
-    uid = _get_current_user_id()
+    uid = current_user_id()
     if not uid:
         return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
     b = Budget.query.filter_by(id=bid, user_id=uid).first()
@@ -104,12 +77,12 @@ def update_budget(bid):
     data = request.get_json(silent=True) or {}
     if "limit_amount" in data:
         try:
-            val = float(data["limit_amount"])
-        except (TypeError, ValueError):
+            val = to_cents(data["limit_amount"])
+        except ValueError:
             return {"message": "limit_amount mora biti broj"}, 400
         if val < 0:
             return {"message": "limit_amount mora biti >= 0"}, 400
-        b.limit_amount = val
+        b.limit_cents = val
     if "month" in data:
         m = (data["month"] or "").strip()
         if len(m) != 7 or "-" not in m:
@@ -125,78 +98,126 @@ def update_budget(bid):
             return {"message": "Kategorija ne postoji ili ne pripada korisniku"}, 404
         b.category_id = cat_id
 
+    b.seq = bump_data_version(uid)
     db.session.commit()
-    return {"id": b.id, "category_id": b.category_id, "month": b.month, "limit_amount": float(b.limit_amount)}, 200
+    return {"id": b.id, "category_id": b.category_id, "month": b.month, "limit_amount": from_cents(b.limit_cents)}, 200
 
 @bp_budgets.delete("/<int:bid>")
 @jwt_required()
 def delete_budget(bid):
-    uid = _get_current_user_id()
+    uid = current_user_id()
     if not uid:
         return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
     b = Budget.query.filter_by(id=bid, user_id=uid).first()
     if not b:
         return {"message": "Budžet ne postoji"}, 404
     db.session.delete(b)
+    record_deletion(uid, "budget", b.id, bump_data_version(uid))
     db.session.commit()
     return {"ok": True}, 200
 
-# — SUMMARY: potrošnja po kategorijama za dati mesec (samo EXPENSE) —
+MAX_SUMMARY_MONTHS = 120
+
+def _summary_rows(uid, from_month: str, to_month: str):
+    # jedan upit: budžeti u opsegu + ime kategorije + potrošnja iz rollup-a (LEFT JOIN)
+    spent = MonthlyCategoryTotal
+    return (
+        db.session.query(
+            Budget.month,
+            Budget.category_id,
+            Category.name,
+            Budget.limit_cents,
+            func.coalesce(spent.total_cents, 0).label("spent"),
+        )
+        .outerjoin(Category, Category.id == Budget.category_id)
+        .outerjoin(spent, and_(
+            spent.user_id == Budget.user_id,
+            spent.month == Budget.month,
+            spent.category_id == Budget.category_id,
+            spent.type == "EXPENSE",
+        ))
+        .filter(Budget.user_id == uid, Budget.month >= from_month, Budget.month <= to_month)
+        .order_by(Budget.month, Budget.category_id)
+        .all()
+    )
+
+# — SUMMARY: potrošnja po kategorijama za mesec ili opseg meseci (samo EXPENSE) —
 @bp_budgets.get("/summary")
 @jwt_required()
+@cached_response
 def budgets_summary():
     """
     Query params:
-      - month=YYYY-MM (obavezno); računa SUM(expense) po kategoriji za opseg meseca
+      - month=YYYY-MM; SUM(expense) po kategoriji čita iz monthly_category_total
+      - ili from_month=YYYY-MM & to_month=YYYY-MM za opseg; tada svaki red ima i
+        rolling vrednosti od januara godine from_month:
+        ytd_spent, ytd_limit, carry_in (neiskorišćen limit prethodnih meseci), available
     Response:
-      [{ category_id, category_name, limit_amount, spent, remaining, month }]
+      [{ category_id, category_name, limit_amount, spent, remaining, month, ... }]
     """
-    uid = _get_current_user_id()
+    uid = current_user_id()
     if not uid:
         return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
 
-    month = request.args.get("month")
-    if not month:
-        # default: tekući mesec
-        month = datetime.utcnow().strftime("%Y-%m")
-    start, end = _month_range(month)
-    if not start:
-        return {"message": "month mora biti YYYY-MM"}, 400
-
-    # budzet = user+month
-    budgets = Budget.query.filter_by(user_id=uid, month=month).all()
-
-    # potroseno po kategoriji (EXPENSE) u mesecu
-    spent_rows = (
-        db.session.query(
-            Transaction.category_id,
-            func.coalesce(func.sum(Transaction.amount), 0.0).label("spent"),
-        )
-        .filter(
-            Transaction.user_id == uid,
-            Transaction.type == "EXPENSE",
-            Transaction.date >= start,
-            Transaction.date <= end,
-        )
-        .group_by(Transaction.category_id)
-        .all()
-    )
-    spent_map = {row.category_id: float(row.spent) for row in spent_rows}
-
-    # imena kategorija
-    cats = Category.query.filter_by(user_id=uid).all()
-    cat_map = {c.id: c.name for c in cats}
-
+    from_month = request.args.get("from_month")
+    to_month = request.args.get("to_month")
+    if not (from_month or to_month):
+        month = request.args.get("month")
+        if not month:
+            # default: tekući mesec
+            month = datetime.utcnow().strftime("%Y-%m")
+        start, _ = month_range(month)
+        if not start:
+            return {"message": "month mora biti YYYY-MM"}, 400
+        month = start.strftime("%Y-%m")
+        out = []
+        for m, cat_id, cat_name, limit_cents, spent in _summary_rows(uid, month, month):
+            out.append({
+                "month": m,
+                "category_id": cat_id,
+                "category_name": cat_name or "—",
+                "limit_amount": from_cents(limit_cents),
+                "spent": from_cents(spent),
+                "remaining": from_cents(limit_cents - spent),
+            })
+        return out, 200
+
+    fstart, _ = month_range(from_month or to_month)
+    tstart, _ = month_range(to_month or from_month)
+    if not fstart or not tstart:
+        return {"message": "from_month/to_month moraju biti YYYY-MM"}, 400
+    if fstart > tstart:
+        return {"message": "from_month mora biti <= to_month"}, 400
+    if (tstart.year - fstart.year) * 12 + tstart.month - fstart.month >= MAX_SUMMARY_MONTHS:
+        return {"message": f"Opseg može imati najviše {MAX_SUMMARY_MONTHS} meseci"}, 400
+    from_key, to_key = fstart.strftime("%Y-%m"), tstart.strftime("%Y-%m")
+
+    # čitamo od januara, da bi YTD i prenos neiskorišćenog limita bili tačni i za prvi traženi mesec;
+    # sve sume su u celim centima, u dinare se pretvara tek pri ispisu
+    rolling = {}  # category_id -> [godina, ytd_spent, ytd_limit, carry]
     out = []
-    for b in budgets:
-        spent = spent_map.get(b.category_id, 0.0)
-        remaining = float(b.limit_amount) - spent
+    for m, cat_id, cat_name, limit_cents, spent in _summary_rows(uid, f"{fstart.year}-01", to_key):
+        year = m[:4]
+        r = rolling.get(cat_id)
+        if r is None or r[0] != year:
+            r = rolling[cat_id] = [year, 0, 0, 0]
+        carry_in = r[3]
+        available = limit_cents + carry_in
+        r[1] += spent
+        r[2] += limit_cents
+        r[3] = max(available - spent, 0)
+        if m < from_key:
+            continue
         out.append({
-            "month": month,
-            "category_id": b.category_id,
-            "category_name": cat_map.get(b.category_id, "—"),
-            "limit_amount": float(b.limit_amount),
-            "spent": round(spent, 2),
-            "remaining": round(remaining, 2),
+            "month": m,
+            "category_id": cat_id,
+            "category_name": cat_name or "—",
+            "limit_amount": from_cents(limit_cents),
+            "spent": from_cents(spent),
+            "remaining": from_cents(limit_cents - spent),
+            "carry_in": from_cents(carry_in),
+            "available": from_cents(available),
+            "ytd_spent": from_cents(r[1]),
+            "ytd_limit": from_cents(r[2]),
         })
     return out, 200
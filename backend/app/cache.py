@@ -0,0 +1,181 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+from flask import current_app, make_response, request
+from sqlalchemy import select, update
+from .database import db
+from .events import queue_event
+from .replica import mark_write
+from .identity import current_user_id
+from .models import User
+
+# Keš odgovora za "dashboard" GET rute.
+# Svaki upis u transactions/categories/budgets povećava user.data_version u istoj
+# DB transakciji; ETag i ključ keša su izvedeni iz te verzije, pa se stari unosi
+# nikad ne serviraju – samo ispadnu iz LRU-a.
+
+
+# — verzija podataka po korisniku —
+
+def bump_data_version(uid: int) -> int:
+    """Povećava verziju podataka korisnika i vraća novu vrednost. Poziva se pre commit-a, u istoj sesiji kao upis.
+
+    Ista vrednost je i sekvenca izmene za /api/sync (kolona seq na izmenjenim redovima).
+    UPDATE drži zaključan red korisnika do commit-a, pa se sekvence istog korisnika
+    commit-uju redom kojim su dodeljene.
+    """
+    stmt = update(User).where(User.id == uid).values(data_version=User.data_version + 1)
+    if db.session.get_bind().dialect.update_returning:
+        seq = db.session.execute(stmt.returning(User.data_version)).scalar()
+    else:
+        db.session.execute(stmt)
+        seq = current_data_version(uid)
+    queue_event(uid, "change", {"seq": seq})  # SSE /api/events, objavljuje se posle commit-a
+    mark_write(uid)  # read-your-writes: GET-ovi korisnika idu na primarnu dok replika ne stigne
+    return seq
+
+def current_data_version(uid: int) -> int:
+    return db.session.execute(select(User.data_version).where(User.id == uid)).scalar() or 0
+
+
+# — backend-i keša —
+
+# Backend je bilo šta sa get(key) -> (body, mimetype) | None i set(key, (body, mimetype)).
+
+class MemoryLRU:
+    """LRU u memoriji procesa (svaki gunicorn worker ima svoj)."""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            val = self._data.get(key)
+            if val is not None:
+                self._data.move_to_end(key)
+            return val
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class SQLiteLRU:
+    """LRU u zajedničkom SQLite fajlu – deli se između gunicorn worker-a na istoj mašini."""
+
+    TOUCH_INTERVAL = 30  # sekundi; pogodak osvežava "touched" najviše ovoliko često (čitanje ne piše u fajl)
+
+    def __init__(self, path, maxsize=512):
+        self.path = path
+        self.maxsize = maxsize
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                " key TEXT PRIMARY KEY, body BLOB NOT NULL, mimetype TEXT NOT NULL, touched REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_touched ON response_cache (touched)")
+        self._close()  # gunicorn --preload: master ne ostavlja otvorenu konekciju worker-ima
+
+    def _close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _conn(self):
+        # konekcija po (procesu, niti) – sqlite3 konekcije se ne dele posle fork-a
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT body, mimetype, touched FROM response_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[2] > self.TOUCH_INTERVAL:
+            # LRU redosled je grub (do TOUCH_INTERVAL), ali pogoci ne čekaju na write lock fajla
+            conn.execute("UPDATE response_cache SET touched = ? WHERE key = ?", (now, key))
+        return bytes(row[0]), row[1]
+
+    def set(self, key, value):
+        body, mimetype = value
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO response_cache (key, body, mimetype, touched) VALUES (?, ?, ?, ?)",
+            (key, body, mimetype, time.time()),
+        )
+        conn.execute(
+            "DELETE FROM response_cache WHERE key IN ("
+            " SELECT key FROM response_cache ORDER BY touched DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,),
+        )
+
+
+def init_response_cache(app):
+    """RESPONSE_CACHE_BACKEND: 'memory' (podrazumevano), 'sqlite:///putanja.db' ili 'none'."""
+    spec = app.config["RESPONSE_CACHE_BACKEND"]
+    size = app.config["RESPONSE_CACHE_SIZE"]
+    if spec == "none":
+        backend = None
+    elif spec == "memory":
+        backend = MemoryLRU(size)
+    elif spec.startswith("sqlite:///"):
+        backend = SQLiteLRU(spec[len("sqlite:///"):], size)
+    else:
+        raise ValueError(f"Nepoznat RESPONSE_CACHE_BACKEND: {spec}")
+    app.extensions["response_cache"] = backend
+
+
+# — dekorator za GET rute —
+
+def cached_response(view):
+    """ETag/304 + keširanje tela odgovora po (korisnik, verzija podataka, URL). Ide ispod @jwt_required()."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        uid = current_user_id()
+        if uid is None:
+            return view(*args, **kwargs)
+
+        version = current_data_version(uid)
+        # tekući mesec je deo ETag-a jer rute bez ?month= podrazumevaju tekući mesec
+        etag = f"u{uid}-v{version}-{datetime.utcnow():%Y%m}"
+        if request.if_none_match.contains_weak(etag):  # slabo poređenje – kompresija pravi W/ ETag
+            resp = make_response("", 304)
+            resp.set_etag(etag)
+            resp.headers["Cache-Control"] = "private, no-cache"
+            return resp
+
+        backend = current_app.extensions.get("response_cache")
+        key = f"{etag}:{request.full_path}"
+        hit = backend.get(key) if backend is not None else None
+        if hit is not None:
+            body, mimetype = hit
+            resp = make_response(body, 200)
+            resp.mimetype = mimetype
+        else:
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code != 200:
+                return resp
+            if backend is not None:
+                backend.set(key, (resp.get_data(), resp.mimetype))
+
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp
+    return wrapper
@@ -0,0 +1,192 @@
+import re
+import sqlite3
+import time
+from datetime import datetime
+import click
+from flask import current_app
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from .database import db
+from . import archive, rollup
+from .replica import REPLICA_PREFIX
+from .seed import SYNTHETIC_PASSWORD, seed_synthetic
+from .utils import add_months
+
+# GET rute koje moraju da rade isključivo preko indeksa (bez full table scan-a)
+PLAN_CHECK_ROUTES = [
+    "/api/transactions/",
+    "/api/transactions/?limit=50",
+    "/api/transactions/?type=EXPENSE&limit=50",
+    "/api/transactions/?category_id=1",
+    "/api/transactions/?from={start}&to={end}",
+    "/api/transactions/?q=a&limit=50",
+    "/api/overview/?month={month}",
+    "/api/overview/series?from={month}-01&to={month}-28&bucket=day",
+    "/api/overview/series?from={month}-01&to={month}-28&bucket=month",
+    "/api/budgets/summary?month={month}",
+    "/api/budgets/summary?from_month={month}&to_month={month}",
+    "/api/budgets/",
+    "/api/categories/",
+    "/api/sync/?since=1",
+    "/api/transactions/?from=2000-01-01T00:00:00&limit=50",  # zalazi u transaction_archive (UNION ALL)
+]
+
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)")  # "SCAN TABLE x" na SQLite < 3.36
+
+
+def _explain_sqlite(conn, statement, params):
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params).all()
+    return [r[-1] for r in rows]
+
+
+def register_cli(app):
+    @app.cli.command("check-query-plans")
+    @click.option("--user-id", default=1, show_default=True, help="Korisnik u čije ime se gađaju rute.")
+    @click.option("--month", default="2025-01", show_default=True, help="Mesec za overview/summary (YYYY-MM).")
+    def check_query_plans(user_id, month):
+        """Pokreće GET rute i pada ako EXPLAIN QUERY PLAN pokaže SCAN neke tabele."""
+        if db.engine.dialect.name != "sqlite":
+            raise click.ClickException("check-query-plans trenutno podržava samo SQLite")
+
+        captured = []
+
+        def _capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                captured.append((statement, parameters))
+
+        token = create_access_token(identity=str(user_id))
+        headers = {"Authorization": f"Bearer {token}"}
+        client = current_app.test_client()
+        fmt = {"month": month, "start": f"{month}-01T00:00:00", "end": f"{month}-28T00:00:00"}
+
+        tables = set(db.metadata.tables)
+        failures = []
+        event.listen(db.engine, "before_cursor_execute", _capture)
+        try:
+            for route in PLAN_CHECK_ROUTES:
+                url = route.format(**fmt)
+                captured.clear()
+                resp = client.get(url, headers=headers)
+                if resp.status_code >= 500:
+                    failures.append((url, f"HTTP {resp.status_code}", ""))
+                    continue
+                stmts = list(captured)
+                with db.engine.connect() as conn:
+                    for statement, params in stmts:
+                        for detail in _explain_sqlite(conn, statement, params):
+                            m = _SCAN_RE.match(detail)
+                            if m and m.group(1) in tables:
+                                failures.append((url, detail, statement))
+                click.echo(f"{url}: {len(stmts)} upit(a)")
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _capture)
+
+        if failures:
+            for url, detail, statement in failures:
+                click.echo(f"\n[SCAN] {url}\n  {detail}\n  {' '.join(statement.split())}", err=True)
+            raise click.ClickException(f"{len(failures)} upit(a) radi full table scan")
+        click.echo("OK – svi upiti koriste indekse")
+
+    @app.cli.group("rollup")
+    def rollup_group():
+        """Održavanje monthly_category_total rollup tabele."""
+
+    @rollup_group.command("rebuild")
+    @click.option("--user-id", type=int, default=None, help="Samo za jednog korisnika (podrazumevano svi).")
+    def rollup_rebuild(user_id):
+        """Ponovo računa rollup iz sirovih transakcija."""
+        n = rollup.rebuild(user_id)
+        click.echo(f"rollup ponovo izračunat: {n} redova")
+
+    @rollup_group.command("verify")
+    @click.option("--user-id", type=int, default=None, help="Samo za jednog korisnika (podrazumevano svi).")
+    def rollup_verify(user_id):
+        """Poredi rollup sa sirovim transakcijama i pada ako postoji odstupanje."""
+        drift = rollup.verify(user_id)
+        for key, exp, act in drift:
+            click.echo(f"DRIFT {key}: očekivano total_cents={exp[0]} count={exp[1]}, "
+                       f"zatečeno total_cents={act[0]} count={act[1]}", err=True)
+        if drift:
+            raise click.ClickException(f"{len(drift)} red(ova) rollup-a odstupa – pokreni 'flask rollup rebuild'")
+        click.echo("OK – rollup odgovara transakcijama")
+
+    @app.cli.command("seed-synthetic")
+    @click.option("--users", default=10, show_default=True)
+    @click.option("--transactions", "tx_per_user", default=10000, show_default=True, help="Transakcija po korisniku.")
+    @click.option("--months", default=24, show_default=True, help="Koliko meseci unazad pokrivaju podaci.")
+    @click.option("--batch", default=10000, show_default=True, help="Redova po INSERT/commit paketu.")
+    @click.option("--prefix", default="synth", show_default=True, help="Prefiks email-a (<prefix>-<n>@example.com).")
+    @click.option("--seed", type=int, default=None, help="Seed za ponovljive podatke.")
+    def seed_synthetic_cmd(users, tx_per_user, months, batch, prefix, seed):
+        """Generiše sintetičke korisnike, kategorije, budžete i transakcije za benchmark."""
+        emails = seed_synthetic(users, tx_per_user, months, batch, prefix, seed, log=click.echo)
+        click.echo(f"gotovo: {len(emails)} korisnika, lozinka '{SYNTHETIC_PASSWORD}'")
+
+    @app.cli.command("replica-sync")
+    @click.option("--interval", type=float, default=0, help="Ponavljaj na svakih N sekundi (0 = jednom).")
+    def replica_sync(interval):
+        """Kopira primarnu SQLite bazu u SQLite replike – lokalna zamena za replikaciju (sa kašnjenjem)."""
+        if db.engine.dialect.name != "sqlite":
+            raise click.ClickException("replica-sync radi samo kad je primarna baza SQLite")
+        targets = [
+            (key, engine.url.database) for key, engine in db.engines.items()
+            if key and key.startswith(REPLICA_PREFIX) and engine.dialect.name == "sqlite"
+        ]
+        if not targets:
+            raise click.ClickException("DATABASE_REPLICA_URLS ne sadrži nijednu SQLite repliku")
+        while True:
+            for key, path in targets:
+                t0 = time.perf_counter()
+                src, dst = sqlite3.connect(db.engine.url.database), sqlite3.connect(path, timeout=30)
+                try:
+                    src.backup(dst)  # konzistentan snimak; čitaoci replike čekaju samo dok traje kopiranje
+                finally:
+                    src.close()
+                    dst.close()
+                click.echo(f"{key}: {path} ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+            if not interval:
+                break
+            time.sleep(interval)
+
+    @app.cli.command("archive-transactions")
+    @click.option("--months", type=int, default=None, help="Horizont u mesecima (podrazumevano ARCHIVE_HORIZON_MONTHS).")
+    @click.option("--batch", default=10000, show_default=True, help="Redova po premeštanju/commit-u.")
+    @click.option("--dry-run", is_flag=True, help="Samo prebroj šta bi bilo arhivirano.")
+    @click.option("--no-vacuum", is_flag=True, help="Preskoči ANALYZE/VACUUM.")
+    @click.option("--verify", "verify_rollup", is_flag=True, help="Posle premeštanja proveri rollup (transaction + arhiva).")
+    def archive_transactions(months, batch, dry_run, no_vacuum, verify_rollup):
+        """Premešta transakcije starije od horizonta u transaction_archive, pa ANALYZE/VACUUM i izveštaj o prostoru."""
+        cfg = current_app.config
+        months = cfg["ARCHIVE_HORIZON_MONTHS"] if months is None else months
+        if months <= cfg["FORECAST_LOOKBACK_MONTHS"]:
+            # forecast model čita samo hot transakcije
+            raise click.ClickException(f"horizont mora biti veći od FORECAST_LOOKBACK_MONTHS ({cfg['FORECAST_LOOKBACK_MONTHS']})")
+        first = add_months(datetime.utcnow().date(), -months)
+        cutoff = datetime(first.year, first.month, 1)
+        click.echo(f"arhiviraju se transakcije pre {cutoff.date().isoformat()}")
+
+        before = archive.storage_report()
+        t0 = time.perf_counter()
+        moved = archive.archive_transactions(cutoff, batch, dry_run, log=click.echo)
+        if dry_run:
+            click.echo(f"dry-run: {moved} transakcija bi bilo arhivirano")
+            return
+        click.echo(f"arhivirano {moved} transakcija za {time.perf_counter() - t0:.1f}s")
+        if verify_rollup:
+            drift = rollup.verify()
+            if drift:
+                raise click.ClickException(f"{len(drift)} red(ova) rollup-a odstupa – pokreni 'flask rollup rebuild'")
+            click.echo("rollup OK")
+        if not no_vacuum:
+            t0 = time.perf_counter()
+            archive.analyze_vacuum()
+            click.echo(f"ANALYZE/VACUUM za {time.perf_counter() - t0:.1f}s")
+
+        after = archive.storage_report()
+        mb = 1024 * 1024
+        for name in sorted(set(before) | set(after)):
+            b, a = before.get(name, 0), after.get(name, 0)
+            if b != a or name.startswith("__"):
+                click.echo(f"  {name:40s} {b / mb:9.1f} MB -> {a / mb:9.1f} MB")
+        if "__total__" in before:
+            click.echo(f"oslobođeno: {(before['__total__'] - after['__total__']) / mb:.1f} MB")
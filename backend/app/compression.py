@@ -0,0 +1,103 @@
+import zlib
+from flask import request
+
+try:  # opciono: brotli daje manji odgovor od gzip-a za isti CPU; bez njega samo gzip
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Kompresija odgovora (gzip, br kad je paket instaliran) direktno u aplikaciji –
+# API klijenti pričaju sa gunicorn-om bez nginx-a ispred.
+#  - obični odgovori: kompresuju se ako su >= COMPRESSION_MIN_SIZE bajtova
+#  - strimovani (export): svaki paket se kompresuje i flush-uje odmah, bez baferovanja celog tela
+#  - ETag postaje slab (W/"..."), jer kompresovano telo nije bajt-identično originalu;
+#    cached_response ga poredi slabim poređenjem, pa 304 radi i sa kompresijom
+
+
+def _negotiate(cfg):
+    # najbolji kodek po Accept-Encoding (q=0 znači "ne"); bez header-a -> None (bez kompresije)
+    options = ["br", "gzip"] if brotli is not None and cfg["COMPRESSION_BROTLI"] else ["gzip"]
+    return request.accept_encodings.best_match(options)
+
+
+def _gzip_bytes(body, level):
+    comp = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip zaglavlje
+    return comp.compress(body) + comp.flush()
+
+
+def _gzip_stream(chunks, level):
+    comp = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        if chunk:
+            # sync flush: klijent dobija svaki paket odmah, uz malo lošiji odnos kompresije
+            yield comp.compress(chunk) + comp.flush(zlib.Z_SYNC_FLUSH)
+    yield comp.flush()
+
+
+def _brotli_stream(chunks, quality):
+    comp = brotli.Compressor(quality=quality)
+    for chunk in chunks:
+        if chunk:
+            yield comp.process(chunk) + comp.flush()
+    yield comp.finish()
+
+
+def _compress_stream(resp, encoding, cfg):
+    inner = resp.response
+    charset = getattr(resp, "charset", None) or "utf-8"
+
+    def encoded():
+        for chunk in inner:
+            yield chunk.encode(charset) if isinstance(chunk, str) else chunk
+
+    stream = (_brotli_stream(encoded(), cfg["COMPRESSION_BROTLI_QUALITY"]) if encoding == "br"
+              else _gzip_stream(encoded(), cfg["COMPRESSION_LEVEL"]))
+
+    def closing():
+        try:
+            yield from stream
+        finally:
+            if hasattr(inner, "close"):
+                inner.close()
+
+    resp.response = closing()
+    resp.headers.pop("Content-Length", None)
+
+
+def init_compression(app):
+    cfg = app.config
+    if not cfg["COMPRESSION_ENABLED"]:
+        return
+    mimetypes = {m.strip() for m in cfg["COMPRESSION_MIMETYPES"].split(",") if m.strip()}
+
+    @app.after_request
+    def _compress(resp):
+        if resp.mimetype not in mimetypes:
+            return resp
+        resp.vary.add("Accept-Encoding")
+        if (resp.status_code < 200 or resp.status_code in (204, 206, 304)
+                or "Content-Encoding" in resp.headers or resp.direct_passthrough
+                or request.method == "HEAD"):
+            return resp
+
+        encoding = _negotiate(cfg)
+        if encoding is None:
+            return resp
+
+        if resp.is_streamed:
+            _compress_stream(resp, encoding, cfg)
+        else:
+            body = resp.get_data()
+            if len(body) < cfg["COMPRESSION_MIN_SIZE"]:
+                return resp
+            if encoding == "br":
+                body = brotli.compress(body, quality=cfg["COMPRESSION_BROTLI_QUALITY"])
+            else:
+                body = _gzip_bytes(body, cfg["COMPRESSION_LEVEL"])
+            resp.set_data(body)
+
+        resp.headers["Content-Encoding"] = encoding
+        etag, weak = resp.get_etag()
+        if etag and not weak:
+            resp.set_etag(etag, weak=True)
+        return resp
@@ -4,5 +4,71 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///budget.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DATABASE_REPLICA_URLS = os.getenv("DATABASE_REPLICA_URLS", "")  # zarezom odvojeni; čitanja GET zahteva (app/replica.py)
+    REPLICA_LAG_WINDOW = float(os.getenv("REPLICA_LAG_WINDOW", "5"))  # sekundi posle upisa korisnik čita sa primarne
+    REPLICA_MARKER_BACKEND = os.getenv("REPLICA_MARKER_BACKEND", "sqlite")  # sqlite | sqlite:///putanja.db | memory
+    # engine profil (app/engine.py): auto | none
+    DB_ENGINE_PROFILE = os.getenv("DB_ENGINE_PROFILE", "auto")
+    SQLITE_WAL = os.getenv("SQLITE_WAL", "1") == "1"
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negativno = KiB (64 MiB)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # sekundi
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "dev-jwt")
     JWT_TOKEN_LOCATION = ["headers"]
+    IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))  # redova po INSERT/commit paketu
+    FAST_JSON = os.getenv("FAST_JSON", "1") == "1"  # orjson za JSON odgovore kad je instaliran
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"  # gzip/br za API odgovore
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bajtova; strimovani odgovori se uvek kompresuju
+    COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "1"))  # gzip 1-9 (vidi bench/compression_bench.py)
+    COMPRESSION_BROTLI = os.getenv("COMPRESSION_BROTLI", "1") == "1"  # br kad je paket brotli instaliran
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))  # 0-11
+    ADMISSION_BACKEND = os.getenv("ADMISSION_BACKEND", "sqlite")  # sqlite | sqlite:///putanja.db | memory | none
+    # zahteva u obradi na celoj mašini; 0 = bez limita. Podrazumevano broj worker-a (WEB_CONCURRENCY,
+    # koji čita i gunicorn) minus jedan: sa sync worker-ima veći limit se ne može dostići, a jedan
+    # worker ostaje slobodan za /api/health i /api/metrics dok ostali odbijaju sa 503
+    ADMISSION_MAX_INFLIGHT = int(os.getenv(
+        "ADMISSION_MAX_INFLIGHT", str(max(0, int(os.getenv("WEB_CONCURRENCY", "1")) - 1))
+    ))
+    ADMISSION_SHARDS = int(os.getenv("ADMISSION_SHARDS", "8"))  # SQLite fajlova za bucket-e (shard po klijentu)
+    RATE_LIMIT_CAPACITY = float(os.getenv("RATE_LIMIT_CAPACITY", "60"))  # tokena (dozvoljeni nalet)
+    RATE_LIMIT_REFILL = float(os.getenv("RATE_LIMIT_REFILL", "10"))  # tokena u sekundi po korisniku/IP-u
+    COMPRESSION_MIMETYPES = os.getenv(
+        "COMPRESSION_MIMETYPES", "application/json,application/x-ndjson,text/csv,text/plain"
+    )
+    EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "sqlite")  # sqlite | sqlite:///putanja.db | memory | none
+    EVENTS_RETENTION = float(os.getenv("EVENTS_RETENTION", "300"))  # sekundi; toliko unazad radi Last-Event-ID
+    SSE_STREAMING = os.getenv("SSE_STREAMING", "auto")  # auto (dug stream samo pod gevent/eventlet) | always | never
+    SSE_MAX_DURATION = float(os.getenv("SSE_MAX_DURATION", "300"))  # sekundi po konekciji, pa reconnect
+    SSE_POLL_INTERVAL = float(os.getenv("SSE_POLL_INTERVAL", "1"))  # sekundi između čitanja magistrale
+    SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", "15"))  # sekundi tišine pre ": ping" komentara
+    SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))  # posle koliko ms browser ponovo otvara stream
+    BUDGET_ALERT_THRESHOLDS = os.getenv("BUDGET_ALERT_THRESHOLDS", "80,100")  # % limita budžeta
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")  # memory | sqlite:///putanja.db | none
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+    IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "1024"))  # email -> user_id
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", "300"))  # sekundi
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")  # npr. pbkdf2:sha256:600000
+    PASSWORD_SALT_LENGTH = int(os.getenv("PASSWORD_SALT_LENGTH", "16"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))  # 0 = heširaj u samom worker-u
+    # heširanja u toku na celoj mašini (zbir preko worker-a); držati ispod gunicorn -w; 0 = bez limita
+    PASSWORD_HASH_SLOTS = int(os.getenv("PASSWORD_HASH_SLOTS", "2"))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    METRICS_DIR = os.getenv("METRICS_DIR")  # deljeni direktorijum za snapshot-e worker-a (podrazumevano /tmp/...-<ppid>)
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1"))  # sekundi
+    SQL_DIAGNOSTICS = os.getenv("SQL_DIAGNOSTICS", "0") == "1"  # slow-query log + EXPLAIN + N+1 detekcija
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))  # isti oblik naredbe > N puta po zahtevu
+    FORECAST_LOOKBACK_MONTHS = int(os.getenv("FORECAST_LOOKBACK_MONTHS", "12"))
+    ARCHIVE_HORIZON_MONTHS = int(os.getenv("ARCHIVE_HORIZON_MONTHS", "24"))  # starije ide u transaction_archive (> lookback)
+    FORECAST_WINDOW = int(os.getenv("FORECAST_WINDOW", "3"))  # rolling prosek poslednjih N meseci
+    ANOMALY_Z = float(os.getenv("ANOMALY_Z", "3.0"))
+    ANOMALY_MIN_HISTORY = int(os.getenv("ANOMALY_MIN_HISTORY", "8"))  # min. transakcija u istoriji kategorije
+    # donja granica std-a (log skala, ~ relativno odstupanje): kategorija sa uvek istim iznosom
+    # (kirija) ima std = 0, pa bez granice z nije definisan i anomalija se nikad ne prijavi
+    ANOMALY_STD_FLOOR = float(os.getenv("ANOMALY_STD_FLOOR", "0.1"))
@@ -1,2 +1,4 @@
 from flask_sqlalchemy import SQLAlchemy
-db = SQLAlchemy()
+from .replica import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})  # GET čitanja na replike (app/replica.py)
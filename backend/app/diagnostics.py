@@ -0,0 +1,113 @@
+import json
+import logging
+import re
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from .database import db
+
+# Opcioni dijagnostički režim (SQL_DIAGNOSTICS=1):
+#  - svaka naredba sporija od SLOW_QUERY_MS loguje se kao JSON, sa parametrima i EXPLAIN planom
+#  - zahtev koji isti oblik naredbe izvrši više od N_PLUS_ONE_THRESHOLD puta dobija n_plus_one log
+#  - svaki odgovor nosi X-Query-Summary header (broj naredbi, vreme u bazi, slow, n+1)
+
+log = logging.getLogger("mojbudzet.sql")
+
+_WS = re.compile(r"\s+")
+
+
+def _shape(statement):
+    return _WS.sub(" ", statement).strip()
+
+
+def _explain(cursor, dialect, statement, parameters):
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    try:
+        cur = cursor.connection.cursor()
+        try:
+            cur.execute(prefix + statement, parameters)
+            return [" ".join(str(c) for c in row) if dialect != "sqlite" else row[-1] for row in cur.fetchall()]
+        finally:
+            cur.close()
+    except Exception as e:  # dijagnostika nikad ne sme da obori zahtev
+        return [f"EXPLAIN nije uspeo: {e}"]
+
+
+def _emit(payload):
+    log.warning(json.dumps(payload, default=str, ensure_ascii=False))
+
+
+def init_diagnostics(app):
+    if not app.config["SQL_DIAGNOSTICS"]:
+        return
+    if not log.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(handler)
+        log.propagate = False
+
+    @app.before_request
+    def _start():
+        g._diag_shapes = {}
+        g._diag_count = 0
+        g._diag_time = 0.0
+        g._diag_slow = 0
+
+    @app.after_request
+    def _summary(resp):
+        shapes = g.get("_diag_shapes")
+        if shapes is None:
+            return resp
+        limit = current_app.config["N_PLUS_ONE_THRESHOLD"]
+        repeated = {s: n for s, n in shapes.items() if n > limit}
+        for shape, n in repeated.items():
+            _emit({
+                "event": "n_plus_one",
+                "endpoint": request.endpoint,
+                "path": request.full_path,
+                "count": n,
+                "statement": shape,
+            })
+        resp.headers["X-Query-Summary"] = (
+            f"count={g._diag_count};db_ms={g._diag_time * 1000:.1f};"
+            f"slow={g._diag_slow};n_plus_one={len(repeated)}"
+        )
+        return resp
+
+    with app.app_context():
+        for engine in db.engines.values():
+            dialect = engine.dialect.name
+
+            @event.listens_for(engine, "before_cursor_execute")
+            def _before(conn, cursor, statement, parameters, context, executemany):
+                conn.info.setdefault("_diag_t0", []).append(time.perf_counter())
+
+            @event.listens_for(engine, "after_cursor_execute")
+            def _after(conn, cursor, statement, parameters, context, executemany, dialect=dialect):
+                stack = conn.info.get("_diag_t0")
+                if not stack:
+                    return
+                elapsed = time.perf_counter() - stack.pop()
+                in_request = has_request_context() and "_diag_shapes" in g
+                shape = _shape(statement)
+                if in_request:
+                    g._diag_count += 1
+                    g._diag_time += elapsed
+                    g._diag_shapes[shape] = g._diag_shapes.get(shape, 0) + 1
+
+                if elapsed * 1000 < current_app.config["SLOW_QUERY_MS"]:
+                    return
+                if in_request:
+                    g._diag_slow += 1
+                plan = None
+                if not executemany and shape.upper().startswith(("SELECT", "WITH")):
+                    plan = _explain(cursor, dialect, statement, parameters)
+                _emit({
+                    "event": "slow_query",
+                    "ms": round(elapsed * 1000, 2),
+                    "endpoint": request.endpoint if in_request else None,
+                    "path": request.full_path if in_request else None,
+                    "statement": shape,
+                    "params": parameters if not executemany else f"<executemany x{len(parameters)}>",
+                    "plan": plan,
+                })
@@ -0,0 +1,79 @@
+import os
+import weakref
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from .database import db
+
+# Profili za SQLAlchemy engine: SQLite dobija PRAGMA-e (WAL, busy_timeout, ...) na
+# svakoj novoj konekciji, serverske baze dobijaju pool podešavanja. Sve se bira
+# preko env promenljivih (vidi Config); DB_ENGINE_PROFILE=none isključuje podešavanje.
+
+_engines = weakref.WeakSet()
+
+
+def build_engine_options(cfg, uri=None) -> dict:
+    """Opcije engine-a za URI (podrazumevano SQLALCHEMY_DATABASE_URI) i profil – po dijalektu tog URI-ja."""
+    if cfg["DB_ENGINE_PROFILE"] == "none":
+        return {}
+    url = make_url(uri or cfg["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() == "sqlite":
+        # sqlite3 timeout (sekunde) je isto što i busy_timeout; PRAGMA ga postavlja i eksplicitno
+        return {"connect_args": {"timeout": cfg["SQLITE_BUSY_TIMEOUT_MS"] / 1000}}
+    return {
+        "pool_size": cfg["DB_POOL_SIZE"],
+        "max_overflow": cfg["DB_MAX_OVERFLOW"],
+        "pool_recycle": cfg["DB_POOL_RECYCLE"],
+        "pool_pre_ping": cfg["DB_POOL_PRE_PING"],
+    }
+
+
+def build_bind_options(cfg, binds) -> dict:
+    """SQLALCHEMY_BINDS sa opcijama po bind-u: Flask-SQLAlchemy SQLALCHEMY_ENGINE_OPTIONS primenjuje
+    samo na primarnu bazu, a bind (npr. PostgreSQL replika uz SQLite primarnu) mora dobiti opcije
+    svog dijalekta. Opcije zadate u samom bind-u (dict) imaju prednost."""
+    out = {}
+    for key, value in binds.items():
+        spec = {"url": value} if isinstance(value, str) else dict(value)
+        out[key] = {**build_engine_options(cfg, spec["url"]), **spec}
+    return out
+
+
+def _sqlite_pragmas(cfg):
+    pragmas = [
+        ("busy_timeout", cfg["SQLITE_BUSY_TIMEOUT_MS"]),
+        ("synchronous", cfg["SQLITE_SYNCHRONOUS"]),
+        ("cache_size", cfg["SQLITE_CACHE_SIZE"]),
+        ("mmap_size", cfg["SQLITE_MMAP_SIZE"]),
+    ]
+    if cfg["SQLITE_WAL"]:
+        pragmas.insert(0, ("journal_mode", "WAL"))
+    return pragmas
+
+
+def _dispose_in_child():
+    # posle fork-a (gunicorn --preload, pool procesa) dete ne sme da koristi roditeljeve
+    # konekcije; close=False ih samo zaboravi, ne zatvara ih roditelju ispod nogu
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_in_child)
+
+
+def init_engine(app):
+    """Poziva se posle db.init_app: kači connect hook-ove i pamti engine-e za dispose posle fork-a."""
+    cfg = app.config
+    with app.app_context():
+        for engine in db.engines.values():
+            _engines.add(engine)
+            if cfg["DB_ENGINE_PROFILE"] == "none" or engine.dialect.name != "sqlite":
+                continue
+            pragmas = _sqlite_pragmas(cfg)
+
+            @event.listens_for(engine, "connect")
+            def _set_sqlite_pragmas(dbapi_conn, _record, pragmas=pragmas):
+                cur = dbapi_conn.cursor()
+                for name, value in pragmas:
+                    cur.execute(f"PRAGMA {name}={value}")
+                cur.close()
@@ -0,0 +1,298 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from flask import Blueprint, Response, current_app, has_app_context, request
+from flask_jwt_extended import jwt_required
+from sqlalchemy import event, select
+from .database import db
+from .identity import current_user_id
+from .models import Budget, Category, User
+from .utils import from_cents
+
+bp_events = Blueprint("events", __name__)  # registruje se u __init__.py sa url_prefix="/api/events"
+
+# Server-Sent Events: /api/events šalje korisniku
+#  - "change" {seq}: podaci su izmenjeni (seq = nova data_version; klijent zove /api/sync?since=)
+#  - "budget_alert": EXPENSE transakcija je prebacila potrošnju kategorije preko praga limita
+#    (BUDGET_ALERT_THRESHOLDS); računa se iz novog zbira u rollup-u, bez ponovnog summary upita
+# Događaji se skupljaju u sesiji (queue_event) i objavljuju tek posle uspešnog commit-a u
+# EVENTS_BACKEND – zajednički SQLite fajl za sve worker-e; stream ga čita po id-u (Last-Event-ID).
+#
+# Stream ne drži DB konekciju ni sync worker: pod gevent/eventlet worker-om
+# (gunicorn -k gevent --worker-connections 1000 'app:create_app()') konekcija ostaje otvorena
+# do SSE_MAX_DURATION; pod sync/gthread worker-ima odgovor odmah isporuči zaostale događaje
+# i zatvori se, a browser se ponovo kači posle "retry" ms sa Last-Event-ID (SSE_STREAMING=auto).
+
+
+# — magistrala događaja —
+
+class MemoryEventBus:
+    """Događaji u memoriji procesa – samo za jedan worker / razvoj."""
+
+    PER_USER = 256
+
+    def __init__(self, retention=300):
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._events = {}  # user_id -> deque[(id, tip, json, vreme)]
+
+    def publish(self, items):
+        now = time.time()
+        with self._lock:
+            for uid, type_, data in items:
+                self._last_id += 1
+                q = self._events.setdefault(uid, deque(maxlen=self.PER_USER))
+                q.append((self._last_id, type_, data, now))
+
+    def read(self, uid, after):
+        cutoff = time.time() - self.retention
+        with self._lock:
+            return [(i, t, d) for i, t, d, ts in self._events.get(uid, ()) if i > after and ts >= cutoff]
+
+    def last_id(self):
+        return self._last_id
+
+
+class SQLiteEventBus:
+    """Događaji u zajedničkom SQLite fajlu; id je globalno rastući, pa služi i kao Last-Event-ID."""
+
+    PRUNE_EVERY = 500  # svakih N publish() poziva obriši događaje starije od retention
+
+    def __init__(self, path, retention=300):
+        self.path = path
+        self.retention = retention
+        self._calls = 0
+        self._lock = threading.Lock()
+        self._conn_obj, self._pid = None, None
+        self._conn().executescript(
+            "CREATE TABLE IF NOT EXISTS event ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL,"
+            " type TEXT NOT NULL, data TEXT NOT NULL, created REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS ix_event_user_id ON event (user_id, id);"
+        )
+        # fajl je vezan za ppid, pa preživi restart (u kontejneru je ppid uvek isti) – stari događaji
+        # se ionako ne čitaju posle retention, ovde se samo brišu
+        self._conn_obj.execute("DELETE FROM event WHERE created < ?", (time.time() - retention,))
+        self._conn_obj.close()  # gunicorn --preload: master ne ostavlja otvorenu konekciju worker-ima
+        self._conn_obj = None
+
+    def _conn(self):
+        # jedna konekcija po procesu (pod lock-om): pod gevent-om je threading.local po greenlet-u,
+        # pa bi svaki otvoreni stream otvorio svoju konekciju
+        if self._conn_obj is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # događaji su prolazni – trajnost nije potrebna
+            self._conn_obj, self._pid = conn, os.getpid()
+        return self._conn_obj
+
+    def publish(self, items):
+        now = time.time()
+        with self._lock:
+            conn = self._conn()
+            self._calls += 1
+            if self._calls % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM event WHERE created < ?", (now - self.retention,))
+            conn.executemany(
+                "INSERT INTO event (user_id, type, data, created) VALUES (?, ?, ?, ?)",
+                [(uid, type_, data, now) for uid, type_, data in items],
+            )
+
+    def read(self, uid, after):
+        with self._lock:
+            return self._conn().execute(
+                "SELECT id, type, data FROM event WHERE user_id = ? AND id > ? AND created >= ? ORDER BY id",
+                (uid, after, time.time() - self.retention),
+            ).fetchall()
+
+    def last_id(self):
+        with self._lock:
+            return self._conn().execute("SELECT COALESCE(MAX(id), 0) FROM event").fetchone()[0]
+
+
+# — događaji iz upisa —
+
+def queue_event(uid: int, type_: str, data: dict):
+    """Dodaje događaj u red tekuće sesije; objavljuje se posle commit-a, a rollback ga odbacuje."""
+    db.session.info.setdefault("pending_events", []).append((uid, type_, data))
+
+
+def _alert_thresholds():
+    raw = current_app.config["BUDGET_ALERT_THRESHOLDS"] if has_app_context() else ""
+    return sorted({int(p) for p in raw.split(",") if p.strip()}, reverse=True)
+
+
+def queue_budget_alerts(uid: int, month: str, category_id: int, before_cents: int, after_cents: int):
+    """Posle promene EXPENSE zbira (month, category) sa before na after: alert za najviši pređeni prag.
+
+    Poziva se pre commit-a, sa novim zbirom koji vrati bump_monthly_total.
+    """
+    if after_cents <= before_cents:
+        return
+    thresholds = _alert_thresholds()
+    if not thresholds:
+        return
+    row = db.session.execute(
+        select(Budget.limit_cents, Category.name)
+        .join(Category, Category.id == Budget.category_id)
+        .where(Budget.user_id == uid, Budget.month == month, Budget.category_id == category_id)
+    ).first()
+    if row is None or row.limit_cents <= 0:
+        return
+    limit = row.limit_cents
+    for pct in thresholds:
+        # celobrojno: before < limit*pct/100 <= after
+        if before_cents * 100 < limit * pct <= after_cents * 100:
+            queue_event(uid, "budget_alert", {
+                "month": month,
+                "category_id": category_id,
+                "category_name": row.name,
+                "threshold": pct,
+                "limit_amount": from_cents(limit),
+                "spent": from_cents(after_cents),
+                "remaining": from_cents(limit - after_cents),
+            })
+            return
+
+
+def _collapse(pending):
+    # više "change" događaja istog korisnika u jednom commit-u -> samo poslednja sekvenca
+    latest, out = {}, []
+    for uid, type_, data in pending:
+        if type_ == "change":
+            latest[uid] = max(latest.get(uid, 0), data["seq"])
+        else:
+            out.append((uid, type_, data))
+    return [(uid, "change", {"seq": seq}) for uid, seq in latest.items()] + out
+
+
+def _after_commit(session):
+    pending = session.info.pop("pending_events", None)
+    if not pending or not has_app_context():
+        return
+    bus = current_app.extensions.get("events")
+    if bus is None:
+        return
+    items = [(uid, type_, _json(data)) for uid, type_, data in _collapse(pending)]
+    try:
+        bus.publish(items)
+    except sqlite3.Error as e:  # commit je već prošao – događaj se gubi, upis ne
+        current_app.logger.warning("events: objava nije uspela: %s", e)
+
+
+def _after_rollback(session):
+    session.info.pop("pending_events", None)
+
+
+# — stream —
+
+def _streaming(cfg):
+    # auto: dugačak stream samo kad je I/O kooperativan (gevent/eventlet monkey patch)
+    mode = cfg["SSE_STREAMING"]
+    if mode in ("always", "never"):
+        return mode == "always"
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched("socket"):
+            return True
+    except ImportError:
+        pass
+    try:
+        from eventlet import patcher
+        return patcher.is_monkey_patched("socket")
+    except ImportError:
+        return False
+
+
+def _json(data):
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _format(type_, data, event_id=None):
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {type_}\ndata: {data}\n\n"
+
+
+def _stream(bus, uid, after, seq, live, cfg):
+    yield f"retry: {cfg['SSE_RETRY_MS']}\n\n"
+    yield _format("ready", _json({"seq": seq}))
+    deadline = time.monotonic() + (cfg["SSE_MAX_DURATION"] if live else 0)
+    last_write = time.monotonic()
+    while True:
+        events = bus.read(uid, after)
+        for event_id, type_, data in events:
+            yield _format(type_, data, event_id)
+            after = event_id
+        now = time.monotonic()
+        if events:
+            last_write = now
+        if now >= deadline:
+            return
+        if now - last_write >= cfg["SSE_HEARTBEAT"]:
+            yield ": ping\n\n"  # komentar – drži proxy/load balancer konekciju živom
+            last_write = now
+        time.sleep(cfg["SSE_POLL_INTERVAL"])
+
+
+@bp_events.get("/")
+@jwt_required(locations=["headers", "query_string"])  # EventSource ne šalje header-e -> ?jwt=<token>
+def stream():
+    """
+    text/event-stream; nastavak posle prekida preko Last-Event-ID header-a (ili ?last_event_id=).
+    Prvi događaj je "ready" {seq}, zatim "change" {seq} i "budget_alert" {month, category_id,
+    category_name, threshold, limit_amount, spent, remaining}.
+    """
+    uid = current_user_id()
+    if not uid:
+        return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
+    bus = current_app.extensions.get("events")
+    if bus is None:
+        return {"message": "Događaji nisu uključeni"}, 503
+
+    raw = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        after = int(raw) if raw else None
+    except ValueError:
+        return {"message": "Last-Event-ID mora biti integer"}, 400
+    head = bus.last_id()
+    if after is None or after > head:
+        after = head  # nov klijent, ili je magistrala ponovo napravljena (restart) – kreće se od sada
+
+    seq = db.session.execute(select(User.data_version).where(User.id == uid)).scalar() or 0
+    db.session.close()  # stream ne drži DB konekciju
+
+    cfg = current_app.config
+    settings = {k: cfg[k] for k in ("SSE_RETRY_MS", "SSE_MAX_DURATION", "SSE_HEARTBEAT", "SSE_POLL_INTERVAL")}
+    resp = Response(_stream(bus, uid, after, seq, _streaming(cfg), settings), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # nginx ne sme da baferuje stream
+    return resp
+
+
+def init_events(app):
+    """EVENTS_BACKEND: 'sqlite' (fajl po gunicorn masteru), 'sqlite:///putanja.db', 'memory' ili 'none'."""
+    spec = app.config["EVENTS_BACKEND"]
+    retention = app.config["EVENTS_RETENTION"]
+    if spec == "none":
+        return
+    if spec == "memory":
+        bus = MemoryEventBus(retention)
+    elif spec == "sqlite" or spec.startswith("sqlite:///"):
+        path = spec[len("sqlite:///"):] if spec != "sqlite" else os.path.join(
+            # worker-i istog gunicorn mastera imaju isti ppid -> isti fajl
+            tempfile.gettempdir(), f"mojbudzet-events-{os.getppid()}.db"
+        )
+        bus = SQLiteEventBus(path, retention)
+    else:
+        raise ValueError(f"Nepoznat EVENTS_BACKEND: {spec}")
+    app.extensions["events"] = bus
+
+    # db.session je zajednički za sve aplikacije u procesu – slušaoci se registruju jednom
+    if not event.contains(db.session, "after_commit", _after_commit):
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
@@ -0,0 +1,220 @@
+from calendar import monthrange
+from datetime import datetime
+from flask import Blueprint, current_app, request
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select
+from .database import db
+from .identity import current_user_id
+from .models import Budget, Category, Transaction
+from .utils import add_months, from_cents, month_range
+from .cache import MemoryLRU, current_data_version
+from .admission import admission_cost
+
+bp_forecast = Blueprint("forecast", __name__)  # registruje se u __init__.py sa url_prefix="/api/forecast"
+
+# Model po (korisnik, verzija podataka, mesec): svaki upis povećava data_version,
+# pa nova transakcija automatski poništava keširani model.
+_model_cache = MemoryLRU(256)
+
+# NumPy (~100 ms uvoza) se učitava pri prvom forecast zahtevu koji nije u kešu, a ne pri
+# podizanju worker-a; create_app("preload") ga učita unapred u gunicorn masteru (load_numpy).
+np = None
+
+
+def load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def _build_model(uid, month_start, month_end):
+    cfg = current_app.config
+    hist_start = add_months(month_start, -cfg["FORECAST_LOOKBACK_MONTHS"])
+
+    # samo kolone (iznos u celim centima) – bez ORM entiteta
+    rows = db.session.execute(
+        select(Transaction.id, Transaction.category_id, Transaction.date, Transaction.amount_cents)
+        .where(
+            Transaction.user_id == uid,
+            Transaction.type == "EXPENSE",
+            Transaction.date >= hist_start,
+            Transaction.date < month_end,
+        )
+    ).all()
+    if not rows:
+        return None
+
+    load_numpy()
+    ids, cats, dates, amounts = (np.asarray(col) for col in zip(*rows))
+    amounts = amounts.astype(np.float64) / 100  # model radi u dinarima
+    months = np.asarray(dates, dtype="datetime64[s]").astype("datetime64[M]")
+    first = np.datetime64(hist_start.strftime("%Y-%m"), "M")
+    month_idx = (months - first).astype(np.int64)
+    n_months = int(np.datetime64(month_start.strftime("%Y-%m"), "M") - first) + 1
+    cat_ids, cat_idx = np.unique(cats, return_inverse=True)
+
+    # matrica kategorija x meseci (poslednja kolona = ciljni mesec)
+    totals = np.zeros((len(cat_ids), n_months))
+    np.add.at(totals, (cat_idx, month_idx), amounts)
+
+    # rolling prosek poslednjih w punih meseci pre ciljnog, preko cumsum-a
+    w = max(1, min(cfg["FORECAST_WINDOW"], n_months - 1))
+    hist = totals[:, :-1]
+    if hist.shape[1]:
+        cs = np.cumsum(hist, axis=1)
+        padded = np.concatenate([np.zeros((len(cat_ids), 1)), cs], axis=1)
+        rolling = (padded[:, w:] - padded[:, :-w]) / w
+        rolling_mean = rolling[:, -1]
+    else:
+        rolling_mean = np.zeros(len(cat_ids))
+
+    # statistika pojedinačnih iznosa po kategoriji iz istorije (log skala – iznosi su asimetrični)
+    is_hist = month_idx < n_months - 1
+    logs = np.log1p(amounts)
+    n = np.bincount(cat_idx[is_hist], minlength=len(cat_ids))
+    s1 = np.bincount(cat_idx[is_hist], weights=logs[is_hist], minlength=len(cat_ids))
+    s2 = np.bincount(cat_idx[is_hist], weights=logs[is_hist] ** 2, minlength=len(cat_ids))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s1 / n
+        std = np.sqrt(np.maximum(s2 / n - mean ** 2, 0.0))
+    std = np.maximum(std, cfg["ANOMALY_STD_FLOOR"])  # NaN (kategorija bez istorije) ostaje NaN
+
+    q95 = np.full(len(cat_ids), np.nan)
+    h_cat, h_amt = cat_idx[is_hist], amounts[is_hist]
+    order = np.argsort(h_cat, kind="stable")
+    groups = np.split(h_amt[order], np.cumsum(n)[:-1])
+    for i, g in enumerate(groups):
+        if len(g):
+            q95[i] = np.quantile(g, 0.95)
+
+    cur = ~is_hist
+    return {
+        "cat_ids": cat_ids,
+        "spent": totals[:, -1],
+        "rolling_mean": rolling_mean,
+        "n": n, "mean": mean, "std": std, "q95": q95,
+        "cur_ids": ids[cur], "cur_cat_idx": cat_idx[cur], "cur_amounts": amounts[cur], "cur_dates": dates[cur],
+    }
+
+
+def _get_model(uid, month_start, month_end):
+    key = f"{uid}:{current_data_version(uid)}:{month_start:%Y-%m}"
+    model = _model_cache.get(key)
+    if model is None:
+        model = _build_model(uid, month_start, month_end) or {}
+        _model_cache.set(key, model)
+    return model or None
+
+
+@bp_forecast.get("/")
+@admission_cost(5)  # NumPy model nad 12 meseci istorije (kad nije u kešu)
+@jwt_required()  # bez cached_response: odgovor zavisi od sata (days_elapsed), model se kešira po data_version
+def get_forecast():
+    """
+    Query params:
+      - month=YYYY-MM (podrazumevano tekući)
+      - z=broj (prag z-score-a za anomalije, podrazumevano ANOMALY_Z)
+    Response:
+      { month, days_elapsed, days_in_month,
+        categories: [{ category_id, category_name, spent_to_date, rolling_mean, projected,
+                       limit_amount, projected_remaining, status }],
+        anomalies: [{ id, category_id, date, title, amount, zscore, category_p95 }] }
+    """
+    uid = current_user_id()
+    if not uid:
+        return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
+
+    cfg = current_app.config
+    month = request.args.get("month") or datetime.utcnow().strftime("%Y-%m")
+    start, end = month_range(month)
+    if not start:
+        return {"message": "month mora biti YYYY-MM"}, 400
+    z_thr = request.args.get("z", type=float)
+    if z_thr is None:
+        z_thr = cfg["ANOMALY_Z"]
+
+    days_in_month = monthrange(start.year, start.month)[1]
+    now = datetime.utcnow()
+    if now >= end:
+        elapsed = days_in_month
+    elif now < start:
+        elapsed = 0
+    else:
+        elapsed = (now - start).total_seconds() / 86400
+
+    limits = {
+        cid: from_cents(lim) for cid, lim in db.session.query(Budget.category_id, Budget.limit_cents)
+        .filter_by(user_id=uid, month=start.strftime("%Y-%m"))
+    }
+    names = dict(db.session.query(Category.id, Category.name).filter_by(user_id=uid))
+
+    model = _get_model(uid, start, end)
+    categories, anomalies = [], []
+    if model:
+        # projekcija: potrošeno do sada + očekivani ostatak meseca po rolling proseku
+        remaining_share = 1.0 - elapsed / days_in_month
+        projected = model["spent"] + model["rolling_mean"] * remaining_share
+        for i, cid in enumerate(model["cat_ids"].tolist()):
+            lim = limits.get(cid)
+            spent = float(model["spent"][i])
+            proj = float(projected[i])
+            status = None
+            if lim is not None:
+                status = "over" if spent > lim else "at_risk" if proj > lim else "ok"
+            categories.append({
+                "category_id": cid,
+                "category_name": names.get(cid, "—"),
+                "spent_to_date": round(spent, 2),
+                "rolling_mean": round(float(model["rolling_mean"][i]), 2),
+                "projected": round(proj, 2),
+                "limit_amount": lim,
+                "projected_remaining": round(lim - proj, 2) if lim is not None else None,
+                "status": status,
+            })
+
+        # anomalije u ciljnom mesecu: visok z-score (log iznosa) i iznos iznad 95. percentila kategorije
+        ci = model["cur_cat_idx"]
+        amt = model["cur_amounts"]
+        enough = model["n"][ci] >= cfg["ANOMALY_MIN_HISTORY"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = (np.log1p(amt) - model["mean"][ci]) / model["std"][ci]
+        z = np.where(np.isfinite(z), z, 0.0)
+        with np.errstate(invalid="ignore"):
+            above_q = amt > model["q95"][ci]
+        flagged = np.nonzero(enough & (z > z_thr) & above_q)[0]
+        if len(flagged):
+            flagged = flagged[np.argsort(-z[flagged])]
+            ids = model["cur_ids"][flagged].tolist()
+            titles = dict(db.session.query(Transaction.id, Transaction.title).filter(Transaction.id.in_(ids)))
+            for j in flagged.tolist():
+                tid = int(model["cur_ids"][j])
+                cid = int(model["cat_ids"][ci[j]])
+                anomalies.append({
+                    "id": tid,
+                    "category_id": cid,
+                    "date": model["cur_dates"][j].isoformat(),
+                    "title": titles.get(tid),
+                    "amount": round(float(amt[j]), 2),
+                    "zscore": round(float(z[j]), 2),
+                    "category_p95": round(float(model["q95"][ci[j]]), 2),
+                })
+
+    # budžetirane kategorije bez ijednog rashoda u periodu
+    seen = set(model["cat_ids"].tolist()) if model else set()
+    for cid, lim in limits.items():
+        if cid not in seen:
+            categories.append({
+                "category_id": cid, "category_name": names.get(cid, "—"),
+                "spent_to_date": 0.0, "rolling_mean": 0.0, "projected": 0.0,
+                "limit_amount": lim, "projected_remaining": lim, "status": "ok",
+            })
+
+    return {
+        "month": start.strftime("%Y-%m"),
+        "days_elapsed": round(elapsed, 2),
+        "days_in_month": days_in_month,
+        "categories": categories,
+        "anomalies": anomalies,
+    }, 200
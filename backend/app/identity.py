@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from flask_jwt_extended import get_current_user
+from .database import db
+from .models import User
+
+# Jedinstveno razrešavanje JWT identiteta -> user_id za sve blueprint-e.
+# flask-jwt-extended poziva user_lookup_loader jednom po zahtevu (rezultat drži u g),
+# a rute ga čitaju preko current_user_id().
+
+
+class TTLCache:
+    """Mali LRU sa rokom trajanja unosa (email -> user_id)."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+def _uid_for_email(email: str):
+    cache = current_app.extensions["identity_cache"]
+    uid = cache.get(email)
+    if uid is None:
+        uid = db.session.query(User.id).filter_by(email=email).scalar()
+        if uid is not None:  # nepostojeće email-ove ne keširamo
+            cache.set(email, uid)
+    return uid
+
+
+def resolve_identity(ident):
+    # int / "123" -> bez upita; email -> keš pa baza; dict -> id/sub
+    if isinstance(ident, int):
+        return ident
+    if isinstance(ident, dict):
+        if isinstance(ident.get("id"), int):
+            return ident["id"]
+        return resolve_identity(ident.get("sub"))
+    if isinstance(ident, str):
+        try:
+            return int(ident)
+        except ValueError:
+            if "@" in ident:
+                return _uid_for_email(ident)
+    return None
+
+
+def current_user_id():
+    """user_id trenutnog zahteva (posle @jwt_required())."""
+    return get_current_user()
+
+
+def init_identity(app, jwt):
+    app.extensions["identity_cache"] = TTLCache(
+        app.config["IDENTITY_CACHE_SIZE"], app.config["IDENTITY_CACHE_TTL"]
+    )
+
+    @jwt.user_lookup_loader
+    def _lookup(_jwt_header, jwt_data):
+        return resolve_identity(jwt_data.get(app.config["JWT_IDENTITY_CLAIM"]))
+
+    @jwt.user_lookup_error_loader
+    def _lookup_error(_jwt_header, _jwt_data):
+        return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
@@ -0,0 +1,61 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+
+try:  # opciono: orjson je višestruko brži od stdlib json-a; bez njega radi stdlib
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# JSON provider za sve odgovore: orjson kad je instaliran (i FAST_JSON nije isključen),
+# inače stdlib json. U oba slučaja Decimal -> broj i datetime/date -> ISO 8601
+# (Flask podrazumevano Decimal pretvara u string, a datetime u HTTP datum).
+
+
+def _default(o):
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+    sort_keys = False  # redosled ključeva prati dict; sortiranje je čist trošak
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.use_orjson = orjson is not None and app.config.get("FAST_JSON", True)
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and not kwargs:
+            return self._orjson_bytes(obj).decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def _orjson_bytes(self, obj, option=0):
+        # orjson sam serijalizuje datetime/date (naive bez sufiksa, isto kao isoformat()); Decimal ide kroz _default
+        return orjson.dumps(obj, default=_default, option=option | orjson.OPT_NON_STR_KEYS)
+
+    def response(self, *args, **kwargs):
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        option = orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        # bytes direktno u odgovor – bez međukoraka kroz str
+        return self._app.response_class(self._orjson_bytes(obj, option), mimetype=self.mimetype)
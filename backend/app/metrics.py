@@ -0,0 +1,181 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from .database import db
+
+# Prometheus-style metrike: latencija po ruti (histogram), statusni kodovi, broj SQL
+# naredbi i vreme u bazi po ruti. Hot path samo ažurira rečnike u memoriji; svaki
+# worker najviše jednom u METRICS_FLUSH_INTERVAL sekundi upisuje svoj snapshot u
+# METRICS_DIR/metrics-<pid>.json, a /api/metrics sabira fajlove svih worker-a.
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "http_requests_total": ("counter", "Broj HTTP zahteva po ruti, metodi i statusu."),
+    "http_request_duration_seconds": ("histogram", "Latencija HTTP zahteva po ruti."),
+    "db_statements_total": ("counter", "Broj SQL naredbi po ruti."),
+    "db_time_seconds_total": ("counter", "Ukupno vreme u bazi po ruti (sekunde)."),
+}
+
+
+class _Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}  # (ime, ((labela, vrednost), ...)) -> vrednost
+        self.hist = {}      # endpoint -> [brojači po bucket-u..., +Inf], suma
+        self.last_flush = 0.0
+
+    def inc(self, name, labels, value=1.0):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def observe(self, endpoint, seconds):
+        with self.lock:
+            h = self.hist.get(endpoint)
+            if h is None:
+                h = self.hist[endpoint] = [[0] * (len(BUCKETS) + 1), 0.0]
+            i = 0
+            while i < len(BUCKETS) and seconds > BUCKETS[i]:
+                i += 1
+            h[0][i] += 1
+            h[1] += seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "counters": [[n, [list(kv) for kv in labels], v] for (n, labels), v in self.counters.items()],
+                "hist": [[ep, list(counts), s] for ep, (counts, s) in self.hist.items()],
+            }
+
+
+_registry = _Registry()
+
+
+def _reset_after_fork():
+    # gunicorn --preload: dete ne sme da nasledi (i ponovo prijavi) brojače mastera
+    global _registry
+    _registry = _Registry()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _metrics_dir():
+    d = current_app.config["METRICS_DIR"]
+    if not d:
+        # worker-i istog gunicorn mastera imaju isti ppid -> isti direktorijum
+        d = os.path.join(tempfile.gettempdir(), f"mojbudzet-metrics-{os.getppid()}")
+    os.makedirs(d, exist_ok=True)
+    return d
+
+
+def _flush(force=False):
+    now = time.monotonic()
+    if not force and now - _registry.last_flush < current_app.config["METRICS_FLUSH_INTERVAL"]:
+        return
+    _registry.last_flush = now
+    d = _metrics_dir()
+    path = os.path.join(d, f"metrics-{os.getpid()}.json")
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp-metrics-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(_registry.snapshot(), f)
+    os.replace(tmp, path)
+
+
+def _merge_all():
+    counters, hist = {}, {}
+    d = _metrics_dir()
+    snapshots = []
+    for name in os.listdir(d):
+        if name.startswith("metrics-") and name.endswith(".json"):
+            try:
+                with open(os.path.join(d, name)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # fajl se upravo menja – biće u sledećem scrape-u
+    for snap in snapshots:
+        for n, labels, v in snap["counters"]:
+            key = (n, tuple(tuple(kv) for kv in labels))
+            counters[key] = counters.get(key, 0.0) + v
+        for ep, counts, s in snap["hist"]:
+            h = hist.setdefault(ep, [[0] * (len(BUCKETS) + 1), 0.0])
+            h[0] = [a + b for a, b in zip(h[0], counts)]
+            h[1] += s
+    return counters, hist
+
+
+def _fmt_labels(labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+def render():
+    counters, hist = _merge_all()
+    lines = []
+    for name in ("http_requests_total", "db_statements_total", "db_time_seconds_total"):
+        kind, text = HELP[name]
+        lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+        for (n, labels), v in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_fmt_labels(labels)} {v:g}")
+    name = "http_request_duration_seconds"
+    kind, text = HELP[name]
+    lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+    for ep, (counts, s) in sorted(hist.items()):
+        cum = 0
+        for le, c in zip([*map(str, BUCKETS), "+Inf"], counts):
+            cum += c
+            lines.append(f'{name}_bucket{{endpoint="{ep}",le="{le}"}} {cum}')
+        lines.append(f'{name}_sum{{endpoint="{ep}"}} {s:g}')
+        lines.append(f'{name}_count{{endpoint="{ep}"}} {cum}')
+    return "\n".join(lines) + "\n"
+
+
+def init_metrics(app):
+    if not app.config["METRICS_ENABLED"]:
+        return
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_t0 = time.perf_counter()
+        g._metrics_sql = 0
+        g._metrics_sql_time = 0.0
+
+    @app.after_request
+    def _record(resp):
+        t0 = g.pop("_metrics_t0", None)
+        if t0 is None:
+            return resp
+        ep = request.endpoint or "unmatched"
+        _registry.observe(ep, time.perf_counter() - t0)
+        _registry.inc("http_requests_total", (("endpoint", ep), ("method", request.method), ("status", str(resp.status_code))))
+        _registry.inc("db_statements_total", (("endpoint", ep),), g.get("_metrics_sql", 0))
+        _registry.inc("db_time_seconds_total", (("endpoint", ep),), g.get("_metrics_sql_time", 0.0))
+        _flush()
+        return resp
+
+    with app.app_context():
+        for engine in db.engines.values():
+            @event.listens_for(engine, "before_cursor_execute")
+            def _sql_start(conn, cursor, statement, parameters, context, executemany):
+                conn.info.setdefault("_metrics_t0", []).append(time.perf_counter())
+
+            @event.listens_for(engine, "after_cursor_execute")
+            def _sql_end(conn, cursor, statement, parameters, context, executemany):
+                stack = conn.info.get("_metrics_t0")
+                if not stack:
+                    return
+                elapsed = time.perf_counter() - stack.pop()
+                if has_request_context():
+                    g._metrics_sql = g.get("_metrics_sql", 0) + 1
+                    g._metrics_sql_time = g.get("_metrics_sql_time", 0.0) + elapsed
+
+    @app.get("/api/metrics")
+    def metrics():
+        _flush(force=True)  # sopstveni brojači ovog worker-a uvek sveži
+        return Response(render(), mimetype="text/plain; version=0.0.4")
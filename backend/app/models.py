@@ -1,6 +1,6 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 from .database import db
+from .passwords import hash_password, verify_password
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -8,32 +8,102 @@ class User(db.Model):
     name = db.Column(db.String(120), nullable=True)
     password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")  # raste sa svakim upisom (ETag)
 
     def set_password(self, raw):
-        self.password_hash = generate_password_hash(raw)
+        self.password_hash = hash_password(raw)
 
     def check_password(self, raw):
-        return check_password_hash(self.password_hash, raw)
+        return verify_password(self.password_hash, raw)
 
 class Category(db.Model):
+    __table_args__ = (
+        db.Index("ix_category_user_id", "user_id"),
+        db.Index("ix_category_user_seq", "user_id", "seq"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     name = db.Column(db.String(80), nullable=False)
     type = db.Column(db.String(10), nullable=False)  # 'INCOME' ili 'EXPENSE'
+    seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")  # data_version poslednje izmene (/api/sync)
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class Transaction(db.Model):
+    __table_args__ = (
+        # lista/overview: WHERE user_id=? [AND date u opsegu] ORDER BY date DESC, id DESC
+        db.Index("ix_transaction_user_date_id", "user_id", "date", "id"),
+        # summary/breakdown: WHERE user_id=? AND type=? AND date u opsegu GROUP BY category_id
+        db.Index("ix_transaction_user_type_date_cat", "user_id", "type", "date", "category_id"),
+        # /api/sync: WHERE user_id=? AND seq > ?
+        db.Index("ix_transaction_user_seq", "user_id", "seq"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey("category.id"), nullable=False)
     type = db.Column(db.String(10), nullable=False)  # 'INCOME' ili 'EXPENSE'
     title = db.Column(db.String(120), nullable=True)  
-    amount = db.Column(db.Numeric(14, 2), nullable=False)  # <- Numeric umesto Float
+    amount_cents = db.Column(db.BigInteger, nullable=False)  # iznos u centima (vidi utils.to_cents)
     date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # <- DateTime
     note = db.Column(db.String(255), nullable=True)
+    seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")  # data_version poslednje izmene (/api/sync)
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+class TransactionArchive(db.Model):
+    # hladne (stare) transakcije – premešta ih "flask archive-transactions" (app/archive.py);
+    # iste kolone i id kao transaction, bez FTS-a; zbirovi ostaju u monthly_category_total
+    __tablename__ = "transaction_archive"
+    __table_args__ = (
+        db.Index("ix_transaction_archive_user_date_id", "user_id", "date", "id"),
+        db.Index("ix_transaction_archive_user_seq", "user_id", "seq"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey("category.id"), nullable=False)
+    type = db.Column(db.String(10), nullable=False)
+    title = db.Column(db.String(120), nullable=True)
+    amount_cents = db.Column(db.BigInteger, nullable=False)
+    date = db.Column(db.DateTime, nullable=False)
+    note = db.Column(db.String(255), nullable=True)
+    seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = db.Column(db.DateTime, nullable=True)
+
 class Budget(db.Model):
+    __table_args__ = (
+        db.Index("ix_budget_user_month", "user_id", "month"),
+        db.Index("ix_budget_user_seq", "user_id", "seq"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey("category.id"), nullable=False)
     month = db.Column(db.String(7), nullable=False)  # 'YYYY-MM'
-    limit_amount = db.Column(db.Float, nullable=False)
\ No newline at end of file
+    limit_cents = db.Column(db.BigInteger, nullable=False)  # limit u centima
+    seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")  # data_version poslednje izmene (/api/sync)
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Tombstone(db.Model):
+    # trag obrisanog reda za /api/sync (entity: 'transaction' | 'category' | 'budget')
+    __table_args__ = (
+        db.Index("ix_tombstone_user_seq", "user_id", "seq"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    seq = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class MonthlyCategoryTotal(db.Model):
+    # rollup: zbir transakcija po (korisnik, mesec, kategorija, tip); održava ga app/rollup.py
+    __tablename__ = "monthly_category_total"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # 'YYYY-MM'
+    category_id = db.Column(db.Integer, db.ForeignKey("category.id"), primary_key=True)
+    type = db.Column(db.String(10), primary_key=True)  # 'INCOME' ili 'EXPENSE'
+    total_cents = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+    tx_count = db.Column(db.Integer, nullable=False, default=0)
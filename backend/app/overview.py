@@ -1,42 +1,167 @@
+from datetime import datetime, timedelta
 from flask import Blueprint, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func
+from flask_jwt_extended import jwt_required
+from sqlalchemy import func, select
 from .database import db
-from .models import Transaction, Category
+from .identity import current_user_id
+from .models import Transaction, Category, MonthlyCategoryTotal
+from .utils import add_months, from_cents, month_range, parse_date
+from .cache import cached_response
+from .archive import spans_archive, to_archive, union_archive
 
 bp_overview = Blueprint("overview", __name__)
 
 @bp_overview.get("/")
 @jwt_required()
+@cached_response
 def get_overview():
-    uid = get_jwt_identity()
-    month = request.args.get("month")
+    uid = current_user_id()
+    month = request.args.get("month") or datetime.utcnow().strftime("%Y-%m")
+    start, _ = month_range(month)
+    if not start:
+        return {"message": "month mora biti YYYY-MM"}, 400
+    # zbirovi dolaze iz rollup tabele (jedan red po kategoriji/tipu), ne iz sirovih transakcija;
+    # sabiraju se celi centi, u dinare se pretvara tek na kraju
+    mkey = start.strftime("%Y-%m")
     base = db.session.query(
-        Transaction.type, func.sum(Transaction.amount)
+        MonthlyCategoryTotal.type, func.sum(MonthlyCategoryTotal.total_cents)
     ).filter(
-        Transaction.user_id==uid,
-        func.substr(Transaction.date, 1, 7)==month
-    ).group_by(Transaction.type).all()
-    sums = {t: float(v or 0) for t, v in base}
-    income = sums.get("INCOME", 0.0)
-    expense = sums.get("EXPENSE", 0.0)
+        MonthlyCategoryTotal.user_id==uid,
+        MonthlyCategoryTotal.month==mkey
+    ).group_by(MonthlyCategoryTotal.type).all()
+    sums = {t: int(v or 0) for t, v in base}
+    income = sums.get("INCOME", 0)
+    expense = sums.get("EXPENSE", 0)
     # breakdown po kategorijama (rashodi)
     rows = db.session.query(
-        Category.name, func.sum(Transaction.amount)
-    ).join(Category, Category.id==Transaction.category_id).filter(
-        Transaction.user_id==uid, Transaction.type=="EXPENSE",
-        func.substr(Transaction.date,1,7)==month
+        Category.name, func.sum(MonthlyCategoryTotal.total_cents)
+    ).join(Category, Category.id==MonthlyCategoryTotal.category_id).filter(
+        MonthlyCategoryTotal.user_id==uid, MonthlyCategoryTotal.type=="EXPENSE",
+        MonthlyCategoryTotal.month==mkey
     ).group_by(Category.name).all()
-    total = float(expense)
-    pie = [{"category": n, "amount": float(a), "share": (float(a)/total*100 if total else 0)} for n,a in rows]
-    latest = db.session.query(Transaction).filter_by(user_id=uid).order_by(Transaction.date.desc()).limit(5).all()
+    pie = [{"category": n, "amount": from_cents(a), "share": (a/expense*100 if expense else 0)} for n,a in rows]
+    latest = union_archive(
+        select(Transaction.id, Transaction.title, Transaction.amount_cents, Transaction.date)
+        .where(Transaction.user_id==uid),
+        uid,
+    )
+    latest = db.session.execute(
+        latest.order_by(latest.selected_columns.date.desc(), latest.selected_columns.id.desc()).limit(5)
+    )
     return {
-        "income_total": income,
-        "spending_total": expense,
-        "balance": income - expense,
+        "income_total": from_cents(income),
+        "spending_total": from_cents(expense),
+        "balance": from_cents(income - expense),
         "pie_breakdown": pie,
         "latest": [
-            {"id": t.id, "title": t.title, "amount": t.amount, "date": t.date.isoformat()}
+            {"id": t.id, "title": t.title, "amount": from_cents(t.amount_cents), "date": t.date.isoformat()}
             for t in latest
         ]
     }
+
+
+MAX_SERIES_BUCKETS = 5000
+
+def _bucket_expr(dialect: str, bucket: str):
+    # ključ bucket-a kao tekst: dan 'YYYY-MM-DD', nedelja = ponedeljak te nedelje 'YYYY-MM-DD'
+    if dialect == "postgresql":
+        if bucket == "week":
+            return func.to_char(func.date_trunc("week", Transaction.date), "YYYY-MM-DD")
+        return func.to_char(Transaction.date, "YYYY-MM-DD")
+    if bucket == "week":
+        return func.date(Transaction.date, "weekday 0", "-6 days")
+    return func.date(Transaction.date)
+
+def _bucket_keys(start, end, bucket: str):
+    # svi ključevi u [start, end] – za popunjavanje praznih bucket-a nulama
+    if bucket == "month":
+        d = start.replace(day=1)
+        while d <= end:
+            yield d.strftime("%Y-%m")
+            d = add_months(d, 1)
+        return
+    step = timedelta(days=7 if bucket == "week" else 1)
+    d = start - timedelta(days=start.weekday()) if bucket == "week" else start
+    while d <= end:
+        yield d.isoformat()
+        d += step
+
+@bp_overview.get("/series")
+@jwt_required()
+@cached_response
+def get_series():
+    """
+    Query params:
+      - from=YYYY-MM-DD, to=YYYY-MM-DD (uključivo; podrazumevano poslednjih 12 meseci)
+      - bucket=day|week|month (podrazumevano month; month zaokružuje opseg na cele mesece)
+      - type=INCOME|EXPENSE, category_id (opciono)
+    Response:
+      { bucket, from, to, series: [{ bucket, income, expense, balance }] } – prazni bucket-i su 0
+    """
+    uid = current_user_id()
+    bucket = request.args.get("bucket", "month")
+    if bucket not in ("day", "week", "month"):
+        return {"message": "bucket mora biti day, week ili month"}, 400
+
+    today = datetime.utcnow().date()
+    end = parse_date(request.args.get("to")) if request.args.get("to") else today
+    start = parse_date(request.args.get("from")) if request.args.get("from") else add_months(today, -11)
+    if not start or not end:
+        return {"message": "from/to moraju biti YYYY-MM-DD"}, 400
+    if start > end:
+        return {"message": "from mora biti <= to"}, 400
+
+    keys = list(_bucket_keys(start, end, bucket))
+    if len(keys) > MAX_SERIES_BUCKETS:
+        return {"message": f"Previše bucket-a (max {MAX_SERIES_BUCKETS}), suzite opseg ili povećajte bucket"}, 400
+
+    t = request.args.get("type")
+    cid = request.args.get("category_id", type=int)
+
+    if bucket == "month":
+        # mesečni bucket-i direktno iz rollup tabele
+        key = MonthlyCategoryTotal.month
+        q = db.session.query(key, MonthlyCategoryTotal.type, func.sum(MonthlyCategoryTotal.total_cents)).filter(
+            MonthlyCategoryTotal.user_id==uid,
+            MonthlyCategoryTotal.month >= keys[0],
+            MonthlyCategoryTotal.month <= keys[-1],
+        )
+        if t in ("INCOME", "EXPENSE"):
+            q = q.filter(MonthlyCategoryTotal.type==t)
+        if cid:
+            q = q.filter(MonthlyCategoryTotal.category_id==cid)
+        q = q.group_by(key, MonthlyCategoryTotal.type)
+    else:
+        key = _bucket_expr(db.session.get_bind().dialect.name, bucket).label("bucket")
+        q = db.session.query(key, Transaction.type, func.sum(Transaction.amount_cents)).filter(
+            Transaction.user_id==uid,
+            Transaction.date >= datetime.combine(start, datetime.min.time()),
+            Transaction.date < datetime.combine(end + timedelta(days=1), datetime.min.time()),
+        )
+        if t in ("INCOME", "EXPENSE"):
+            q = q.filter(Transaction.type==t)
+        if cid:
+            q = q.filter(Transaction.category_id==cid)
+        q = q.group_by(key, Transaction.type)
+
+    results = [q.all()]
+    if bucket != "month" and spans_archive(uid, datetime.combine(start, datetime.min.time())):
+        # dnevni/nedeljni zbirovi iz arhive za deo opsega ispod granice arhive (sume se sabiraju)
+        results.append(db.session.execute(to_archive(q.statement)).all())
+
+    sums = {}
+    for rows in results:
+        for k, typ, cents in rows:
+            sums[(str(k), typ)] = sums.get((str(k), typ), 0) + int(cents or 0)
+
+    series = []
+    for k in keys:
+        income = sums.get((k, "INCOME"), 0)
+        expense = sums.get((k, "EXPENSE"), 0)
+        series.append({
+            "bucket": k,
+            "income": from_cents(income),
+            "expense": from_cents(expense),
+            "balance": from_cents(income - expense),
+        })
+    return {"bucket": bucket, "from": start.isoformat(), "to": end.isoformat(), "series": series}
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+from .slots import FileSlots
+
+# Heširanje lozinki (scrypt/PBKDF2) je CPU-skupo. Broj heširanja u toku je ograničen na
+# PASSWORD_HASH_SLOTS za celu mašinu (mesta deljena između svih gunicorn worker-a, vidi
+# slots.py): kada su sva zauzeta, odmah se baca HashPoolBusy (ruta vraća 503). Sa sync
+# worker-ima svaki worker obrađuje jedan zahtev, pa SLOTS < broj worker-a znači da bar
+# jedan worker uvek ostaje slobodan za health check i ostale rute dok traje nalet login-a.
+# Samo heširanje ide u pool procesa (PASSWORD_HASH_WORKERS) – tek sa gthread/gevent
+# worker-ima to oslobađa i nit koja čeka.
+
+
+class HashPoolBusy(Exception):
+    pass
+
+
+_pool = None
+_pool_pid = None
+_slots = None
+_lock = threading.Lock()
+
+
+def _get_slots():
+    global _slots
+    n = current_app.config["PASSWORD_HASH_SLOTS"]
+    if n <= 0:
+        return None
+    with _lock:
+        if _slots is None or _slots.n != n:
+            _slots = FileSlots(os.path.join(tempfile.gettempdir(), "mojbudzet-hash-slots"), n)
+        return _slots
+
+
+def _get_pool():
+    # pool se pravi lenjo, po procesu – posle gunicorn fork-a svaki worker dobija svoj
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=current_app.config["PASSWORD_HASH_WORKERS"])
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _reset_pool():
+    # neki proces iz pool-a je pao – sledeći poziv pravi novi pool
+    global _pool
+    with _lock:
+        _pool = None
+
+
+def _run(fn, *args):
+    slots = _get_slots()
+    slot = slots.acquire() if slots is not None else None
+    if slots is not None and slot is None:
+        raise HashPoolBusy()
+    release = slot is not None
+    try:
+        if current_app.config["PASSWORD_HASH_WORKERS"] <= 0:
+            return fn(*args)  # bez pool-a (dev/CLI)
+        future = _get_pool().submit(fn, *args)
+        try:
+            return future.result(timeout=current_app.config["PASSWORD_HASH_TIMEOUT"])
+        except FutureTimeout:
+            # proces iz pool-a i dalje hešira – mesto ostaje zauzeto dok se heširanje
+            # stvarno ne završi, inače bi zakasneli hešovi prešli PASSWORD_HASH_SLOTS
+            if release:
+                release = False
+                future.add_done_callback(lambda _f: slots.release(slot))
+            raise HashPoolBusy()
+    except BrokenProcessPool:
+        _reset_pool()
+        raise HashPoolBusy()
+    finally:
+        if release:
+            slots.release(slot)
+
+
+def hash_password(raw: str) -> str:
+    cfg = current_app.config
+    return _run(generate_password_hash, raw, cfg["PASSWORD_HASH_METHOD"], cfg["PASSWORD_SALT_LENGTH"])
+
+
+def verify_password(pw_hash: str, raw: str) -> bool:
+    return _run(check_password_hash, pw_hash, raw)
+
+
+def _full_method(method: str) -> str:
+    # "scrypt" / "pbkdf2:sha256" -> pun oblik koji werkzeug upisuje u heš (podrazumevani parametri)
+    name, *params = method.split(":")
+    defaults = {"scrypt": ["32768", "8", "1"], "pbkdf2": ["sha256", str(DEFAULT_PBKDF2_ITERATIONS)]}.get(name)
+    if defaults is None:
+        return method
+    return ":".join([name] + params + defaults[len(params):])
+
+
+def needs_rehash(pw_hash: str) -> bool:
+    # werkzeug format: "<method>$<salt>$<hash>"
+    return _full_method(pw_hash.split("$", 1)[0]) != _full_method(current_app.config["PASSWORD_HASH_METHOD"])
@@ -0,0 +1,180 @@
+import itertools
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import sqlalchemy as sa
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_jwt_extended import verify_jwt_in_request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+# Čitanje sa replika: GET/HEAD zahtevi čitaju sa jedne od DATABASE_REPLICA_URLS (Flask-SQLAlchemy
+# binds "replica_N"), sve ostalo ide na primarnu bazu. Read-your-writes: svaki upis korisnika
+# (bump_data_version, registracija) ostavlja "last write" marker; GET tog korisnika ide na primarnu
+# dok ne prođe REPLICA_LAG_WINDOW sekundi. U okviru istog zahteva, posle prvog upisa i čitanja idu
+# na primarnu. Lokalno: dva SQLite fajla + "flask replica-sync" (kopija primarne kao replika sa kašnjenjem).
+
+REPLICA_PREFIX = "replica_"
+
+
+def replica_binds(urls: str) -> dict:
+    """DATABASE_REPLICA_URLS (zarezom odvojeni URL-ovi) -> SQLALCHEMY_BINDS."""
+    return {f"{REPLICA_PREFIX}{i}": u.strip() for i, u in enumerate(urls.split(","), 1) if u.strip()}
+
+
+# — "last write" markeri —
+
+class MemoryWriteMarkers:
+    """Markeri u memoriji procesa – za jedan worker / razvoj."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._marks = {}
+
+    def mark(self, uids, now):
+        with self._lock:
+            for uid in uids:
+                self._marks[uid] = now
+
+    def last(self, uid):
+        return self._marks.get(uid, 0.0)
+
+
+class SQLiteWriteMarkers:
+    """Markeri u zajedničkom SQLite fajlu – upis u jednom worker-u vide GET-ovi u svim ostalim."""
+
+    PRUNE_EVERY = 1000  # svakih N mark() poziva obriši markere starije od sat vremena
+
+    def __init__(self, path):
+        self.path = path
+        self._calls = 0
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS write_marker (user_id INTEGER PRIMARY KEY, at REAL NOT NULL)")
+        # fajl preživi restart (isti ppid u kontejneru); markeri stariji od sat vremena ne utiču na rutiranje
+        conn.execute("DELETE FROM write_marker WHERE at < ?", (time.time() - 3600,))
+        conn.close()  # gunicorn --preload: master ne ostavlja otvorenu konekciju worker-ima
+        self._local.conn = None
+
+    def _conn(self):
+        # konekcija po (procesu, niti) – sqlite3 konekcije se ne dele posle fork-a
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # marker je prolazan – trajnost nije potrebna
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def mark(self, uids, now):
+        conn = self._conn()
+        self._calls += 1
+        if self._calls % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM write_marker WHERE at < ?", (now - 3600,))
+        conn.executemany(
+            "INSERT INTO write_marker (user_id, at) VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET at = excluded.at",
+            [(uid, now) for uid in uids],
+        )
+
+    def last(self, uid):
+        row = self._conn().execute("SELECT at FROM write_marker WHERE user_id = ?", (uid,)).fetchone()
+        return row[0] if row else 0.0
+
+
+def mark_write(uid: int):
+    """Beleži upis korisnika; marker se postavlja posle commit-a (vidi _after_commit)."""
+    from .database import db
+    db.session.info.setdefault("written_users", set()).add(uid)
+
+
+def _after_commit(session):
+    uids = session.info.pop("written_users", None)
+    if not uids or not has_app_context():
+        return
+    markers = current_app.extensions.get("replica_markers")
+    if markers is None:
+        return
+    try:
+        markers.mark(uids, time.time())
+    except sqlite3.Error as e:  # bez markera GET može da pročita staru repliku – zabeleži
+        current_app.logger.warning("replica: marker nije upisan: %s", e)
+
+
+def _after_rollback(session):
+    session.info.pop("written_users", None)
+
+
+# — rutiranje —
+
+def _request_user_id():
+    # korisnik iz validnog JWT-a (ako ga ima), razrešen kao u rutama (identity.resolve_identity:
+    # id ili email) – isti user_id pod kojim je mark_write upisao marker
+    from .identity import current_user_id
+    try:
+        verify_jwt_in_request(optional=True)
+        return current_user_id()
+    except Exception:
+        return None
+
+
+def _read_bind():
+    """Bind ključ replike za tekući zahtev ili None (primarna). Odluka se pamti u g."""
+    if not has_request_context() or request.method not in ("GET", "HEAD"):
+        return None
+    if "_read_bind" not in g:
+        state = current_app.extensions.get("replica")
+        key = None
+        if state is not None:
+            g._read_bind = None  # email identitet se razrešava upitom – taj upit ide na primarnu
+            uid = _request_user_id()
+            recent = uid is not None and state["markers"].last(uid) > time.time() - state["lag_window"]
+            if not recent:
+                key = next(state["cycle"])
+        g._read_bind = key
+    return g._read_bind
+
+
+class RoutingSession(Session):
+    """Session koji čitanja GET zahteva šalje na repliku, a upise (flush, DML) na primarnu."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and "replica" in current_app.extensions:
+            if self._flushing or isinstance(clause, sa.UpdateBase):
+                g._read_bind = None  # posle upisa ceo ostatak zahteva čita sa primarne
+            else:
+                key = _read_bind()
+                if key is not None:
+                    return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def init_replicas(app, db):
+    """Poziva se posle db.init_app; bez DATABASE_REPLICA_URLS sve ostaje na primarnoj bazi."""
+    keys = [k for k in app.config.get("SQLALCHEMY_BINDS") or {} if k.startswith(REPLICA_PREFIX)]
+    if not keys:
+        return
+    spec = app.config["REPLICA_MARKER_BACKEND"]
+    if spec == "memory":
+        markers = MemoryWriteMarkers()
+    elif spec == "sqlite" or spec.startswith("sqlite:///"):
+        path = spec[len("sqlite:///"):] if spec != "sqlite" else os.path.join(
+            # worker-i istog gunicorn mastera imaju isti ppid -> isti fajl
+            tempfile.gettempdir(), f"mojbudzet-writes-{os.getppid()}.db"
+        )
+        markers = SQLiteWriteMarkers(path)
+    else:
+        raise ValueError(f"Nepoznat REPLICA_MARKER_BACKEND: {spec}")
+    app.extensions["replica_markers"] = markers
+    app.extensions["replica"] = {
+        "keys": keys,
+        "cycle": itertools.cycle(keys),  # round-robin po zahtevu
+        "markers": markers,
+        "lag_window": app.config["REPLICA_LAG_WINDOW"],
+    }
+
+    # db.session je zajednički za sve aplikacije u procesu – slušaoci se registruju jednom
+    if not event.contains(db.session, "after_commit", _after_commit):
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
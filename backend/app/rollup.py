@@ -0,0 +1,127 @@
+from datetime import datetime
+from sqlalchemy import func, delete, insert, select, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from .database import db
+from .models import MonthlyCategoryTotal, Transaction
+from .archive import to_archive
+
+# Rollup tabela monthly_category_total: svaki upis/izmena/brisanje transakcije
+# mora da pozove bump_monthly_total u ISTOJ sesiji (pre commit-a), da bi
+# zbirovi i sirove transakcije uvek bili konzistentni.
+
+
+def month_key(dt: datetime) -> str:
+    return dt.strftime("%Y-%m")
+
+
+def month_expr(dialect_name: str, col=Transaction.date):
+    # SQL izraz 'YYYY-MM' iz Transaction.date (ili iste kolone podupita)
+    if dialect_name == "postgresql":
+        return func.to_char(col, "YYYY-MM")
+    return func.strftime("%Y-%m", col)
+
+
+def bump_monthly_total(user_id: int, dt: datetime, category_id: int, type_: str, cents: int, count: int = 1) -> int:
+    """Dodaje cents/count na red rollup-a (negativne vrednosti za brisanje). Ne radi commit.
+
+    Vraća novi total_cents reda (za budget alert-e u app/events.py).
+    """
+    month = month_key(dt)
+    values = dict(
+        user_id=user_id, month=month, category_id=category_id, type=type_,
+        total_cents=cents, tx_count=count,
+    )
+    t = MonthlyCategoryTotal.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        ins = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(t).values(**values)
+        stmt = ins.on_conflict_do_update(
+            index_elements=[t.c.user_id, t.c.month, t.c.category_id, t.c.type],
+            set_={"total_cents": t.c.total_cents + ins.excluded.total_cents, "tx_count": t.c.tx_count + ins.excluded.tx_count},
+        )
+        if db.session.get_bind().dialect.insert_returning:
+            return db.session.execute(stmt.returning(t.c.total_cents)).scalar()
+        db.session.execute(stmt)
+        return _current_total(user_id, month, category_id, type_)
+
+    # ostali dijalekti: update, pa insert ako red još ne postoji
+    res = db.session.execute(
+        update(t)
+        .where(t.c.user_id == user_id, t.c.month == month, t.c.category_id == category_id, t.c.type == type_)
+        .values(total_cents=t.c.total_cents + cents, tx_count=t.c.tx_count + count)
+    )
+    if res.rowcount == 0:
+        db.session.execute(insert(t).values(**values))
+    return _current_total(user_id, month, category_id, type_)
+
+
+def _current_total(user_id, month, category_id, type_) -> int:
+    t = MonthlyCategoryTotal.__table__
+    return db.session.execute(
+        select(t.c.total_cents)
+        .where(t.c.user_id == user_id, t.c.month == month, t.c.category_id == category_id, t.c.type == type_)
+    ).scalar() or 0
+
+
+def _raw_totals_select(dialect_name: str, user_id: int | None = None):
+    # sirove transakcije = transaction + transaction_archive (arhivirane ostaju u zbirovima)
+    raw = select(Transaction.user_id, Transaction.date, Transaction.category_id, Transaction.type, Transaction.amount_cents)
+    if user_id is not None:
+        raw = raw.where(Transaction.user_id == user_id)
+    src = union_all(raw, to_archive(raw)).subquery()
+    month = month_expr(dialect_name, src.c.date).label("month")
+    return select(
+        src.c.user_id,
+        month,
+        src.c.category_id,
+        src.c.type,
+        func.sum(src.c.amount_cents).label("total_cents"),
+        func.count().label("tx_count"),
+    ).group_by(src.c.user_id, month, src.c.category_id, src.c.type)
+
+
+def rebuild(user_id: int | None = None) -> int:
+    """Briše i ponovo računa rollup iz sirovih transakcija. Vraća broj redova."""
+    t = MonthlyCategoryTotal.__table__
+    dialect = db.session.get_bind().dialect.name
+    d = delete(t)
+    if user_id is not None:
+        d = d.where(t.c.user_id == user_id)
+    db.session.execute(d)
+    src = _raw_totals_select(dialect, user_id)
+    db.session.execute(
+        insert(t).from_select(["user_id", "month", "category_id", "type", "total_cents", "tx_count"], src)
+    )
+    db.session.commit()
+    q = select(func.count()).select_from(t)
+    if user_id is not None:
+        q = q.where(t.c.user_id == user_id)
+    return db.session.execute(q).scalar()
+
+
+def verify(user_id: int | None = None):
+    """Poredi rollup sa sirovim transakcijama; vraća listu (ključ, očekivano, zatečeno)."""
+    t = MonthlyCategoryTotal.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    # zbirovi su celi centi – poređenje je tačno, bez zaokruživanja
+    expected = {
+        (r.user_id, r.month, r.category_id, r.type): (int(r.total_cents or 0), r.tx_count)
+        for r in db.session.execute(_raw_totals_select(dialect, user_id))
+    }
+    q = select(t.c.user_id, t.c.month, t.c.category_id, t.c.type, t.c.total_cents, t.c.tx_count)
+    if user_id is not None:
+        q = q.where(t.c.user_id == user_id)
+    actual = {
+        (r.user_id, r.month, r.category_id, r.type): (int(r.total_cents or 0), r.tx_count)
+        for r in db.session.execute(q)
+    }
+
+    drift = []
+    for key in sorted(set(expected) | set(actual), key=str):
+        exp = expected.get(key, (0, 0))
+        act = actual.get(key, (0, 0))
+        if exp != act:
+            drift.append((key, exp, act))
+    return drift
@@ -0,0 +1,48 @@
+import re
+from sqlalchemy import column, func, literal, literal_column, or_, table
+from .models import Transaction
+
+# Full-text pretraga po title/note transakcija, isti interfejs za sve baze:
+#   - SQLite: FTS5 external-content tabela transaction_fts (trigeri u migraciji), rang = bm25
+#   - PostgreSQL: to_tsvector izraz + GIN indeks (migracija), rang = -ts_rank
+#   - ostalo: LIKE bez indeksa, rang = 0
+# Rang je uvek "manji = bolji", pa se sortira rastuće.
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+_fts = table("transaction_fts", column("rowid"))
+_FTS = literal_column("transaction_fts")
+
+
+def tokenize(q: str):
+    # korisnički unos -> samo reči; operatori FTS sintakse se nikad ne prosleđuju bazi
+    return _TOKEN.findall(q or "")[:16]
+
+
+def _pg_vector():
+    return func.to_tsvector(
+        "simple", func.coalesce(Transaction.title, "") + " " + func.coalesce(Transaction.note, "")
+    )
+
+
+def apply_search(query, dialect: str, q: str):
+    """Dodaje tekstualni filter na select()/ORM upit; vraća (upit, izraz_ranga) ili (None, None) za prazan q."""
+    tokens = tokenize(q)
+    if not tokens:
+        return None, None
+
+    if dialect == "sqlite":
+        # svaka reč kao prefiks: "rec1"* "rec2"* (implicitni AND)
+        match = " ".join(f'"{t}"*' for t in tokens)
+        query = query.join(_fts, _fts.c.rowid == Transaction.id).filter(_FTS.op("MATCH")(match))
+        return query, func.bm25(_FTS)
+
+    if dialect == "postgresql":
+        tsq = func.to_tsquery("simple", " & ".join(f"{t}:*" for t in tokens))
+        vec = _pg_vector()
+        return query.filter(vec.op("@@")(tsq)), -func.ts_rank(vec, tsq)
+
+    for t in tokens:
+        like = f"%{t}%"
+        query = query.filter(or_(Transaction.title.ilike(like), Transaction.note.ilike(like)))
+    return query, literal(0)
@@ -0,0 +1,95 @@
+import math
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from .database import db
+from .models import Budget, Category, Transaction, User
+from .passwords import hash_password
+from . import rollup
+
+# Generator sintetičkih podataka za benchmark-e (flask seed-synthetic).
+# (ime, tip, težina izbora, mu i sigma za lognormalni iznos u RSD, primeri naslova)
+SYNTHETIC_CATEGORIES = [
+    ("Plata", "INCOME", 1, 11.8, 0.3, ["Plata", "Isplata zarade"]),
+    ("Honorar", "INCOME", 1, 10.0, 0.6, ["Honorar", "Projekat"]),
+    ("Hrana", "EXPENSE", 30, 7.2, 0.8, ["Maxi", "Lidl", "Pekara", "Pijaca", "Idea"]),
+    ("Prevoz", "EXPENSE", 12, 6.0, 0.7, ["Bus plus", "Taxi", "Gorivo", "Parking"]),
+    ("Stanarina", "EXPENSE", 1, 10.6, 0.2, ["Kirija"]),
+    ("Režije", "EXPENSE", 3, 8.3, 0.4, ["Struja", "Infostan", "Internet", "Telefon"]),
+    ("Zabava", "EXPENSE", 8, 7.4, 0.9, ["Bioskop", "Kafić", "Koncert", "Restoran"]),
+    ("Zdravlje", "EXPENSE", 3, 7.6, 0.9, ["Apoteka", "Lekar", "Stomatolog"]),
+    ("Odeća", "EXPENSE", 3, 8.2, 0.8, ["Zara", "H&M", "Patike"]),
+]
+SYNTHETIC_PASSWORD = "Synthetic1!"
+
+
+def _month_starts(first: datetime, last: datetime):
+    y, m = first.year, first.month
+    while (y, m) <= (last.year, last.month):
+        yield datetime(y, m, 1)
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+
+
+def seed_synthetic(users: int, tx_per_user: int, months: int, batch: int = 10000,
+                   prefix: str = "synth", seed: int | None = None, log=print):
+    """Pravi korisnike sa kategorijama, budžetima i transakcijama; vraća listu email-ova."""
+    rnd = random.Random(seed)
+    pw_hash = hash_password(SYNTHETIC_PASSWORD)  # jedan hash za sve – heširanje nije predmet merenja
+    now = datetime.utcnow().replace(microsecond=0)
+    y, m = divmod(now.year * 12 + now.month - 1 - (months - 1), 12)
+    start = datetime(y, m + 1, 1)
+    span = (now - start).total_seconds()
+    emails = []
+
+    for u in range(users):
+        email = f"{prefix}-{u}@example.com"
+        user = User(email=email, name=f"Synthetic {u}", password_hash=pw_hash)
+        db.session.add(user)
+        db.session.flush()
+
+        cats = []
+        for name, type_, weight, mu, sigma, titles in SYNTHETIC_CATEGORIES:
+            c = Category(user_id=user.id, name=name, type=type_)
+            db.session.add(c)
+            cats.append((c, weight, mu, sigma, titles))
+        db.session.flush()
+
+        # budžet za svaku EXPENSE kategoriju u svakom mesecu, oko očekivane mesečne potrošnje
+        total_weight = sum(w for _, w, *_ in cats)
+        tx_per_month = tx_per_user / months
+        budgets = []
+        for ms in _month_starts(start, now):
+            for c, weight, mu, sigma, _ in cats:
+                if c.type != "EXPENSE":
+                    continue
+                expected = tx_per_month * weight / total_weight * math.exp(mu + sigma ** 2 / 2)
+                budgets.append({
+                    "user_id": user.id, "category_id": c.id, "month": ms.strftime("%Y-%m"),
+                    "limit_cents": int(round(expected * rnd.uniform(0.8, 1.3), -2)) * 100,
+                })
+        if budgets:
+            db.session.execute(insert(Budget.__table__), budgets)
+        db.session.commit()
+
+        weights = [w for _, w, *_ in cats]
+        written = 0
+        while written < tx_per_user:
+            n = min(batch, tx_per_user - written)
+            rows = []
+            for c, _, mu, sigma, titles in rnd.choices(cats, weights=weights, k=n):
+                rows.append({
+                    "user_id": user.id, "category_id": c.id, "type": c.type,
+                    "title": rnd.choice(titles),
+                    "amount_cents": round(rnd.lognormvariate(mu, sigma) * 100),
+                    "date": start + timedelta(seconds=rnd.uniform(0, span)),
+                    "note": None,
+                })
+            db.session.execute(insert(Transaction.__table__), rows)
+            db.session.commit()
+            written += n
+
+        rollup.rebuild(user.id)
+        emails.append(email)
+        log(f"{email}: {written} transakcija, {len(budgets)} budžeta")
+
+    return emails
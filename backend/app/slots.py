@@ -0,0 +1,55 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows – mesta važe samo unutar procesa
+    fcntl = None
+
+# Ograničen broj "mesta" zajednički za sve procese na mašini (gunicorn worker-e).
+# Mesto i je fcntl.flock nad fajlom <dir>/slot-<i>.lock: zauzimanje je jedan neblokirajući
+# sistemski poziv bez upisa na disk, a kernel otpušta zaključavanje kad proces umre –
+# nema brojača koji ostaju posle ubijenog worker-a ili restarta kontejnera.
+
+
+class FileSlots:
+    def __init__(self, directory, n):
+        self.n = n
+        self.paths = [os.path.join(directory, f"slot-{i}.lock") for i in range(n)]
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._fds, self._held, self._pid = None, set(), None
+
+    def _open(self):
+        # fd-ovi po procesu: posle fork-a dete otvara svoje, jer flock nad nasleđenim
+        # fd-om deli zaključavanje sa roditeljem i braćom
+        if self._fds is None or self._pid != os.getpid():
+            self._fds = [os.open(p, os.O_RDWR | os.O_CREAT, 0o600) for p in self.paths]
+            self._held, self._pid = set(), os.getpid()
+        return self._fds
+
+    def acquire(self):
+        """Indeks zauzetog mesta ili None ako su sva zauzeta (ne čeka)."""
+        with self._lock:
+            fds = self._open()
+            start = os.getpid() % self.n  # različiti worker-i kreću od različitih mesta
+            for k in range(self.n):
+                i = (start + k) % self.n
+                if i in self._held:  # flock istog fd-a bi uspeo ponovo – niti istog procesa se prate ovde
+                    continue
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(fds[i], fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue
+                self._held.add(i)
+                return i
+            return None
+
+    def release(self, i):
+        with self._lock:
+            if self._pid != os.getpid() or i not in self._held:
+                return
+            self._held.discard(i)
+            if fcntl is not None:
+                fcntl.flock(self._fds[i], fcntl.LOCK_UN)
@@ -0,0 +1,111 @@
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select
+from .database import db
+from .identity import current_user_id
+from .models import Budget, Category, Tombstone, Transaction
+from .cache import cached_response, current_data_version
+from .utils import from_cents
+from .archive import union_archive
+
+bp_sync = Blueprint("sync", __name__)  # registruje se u __init__.py sa url_prefix="/api/sync"
+
+# Delta sinhronizacija: svaki upis dobija seq = nova user.data_version (cache.bump_data_version),
+# brisanja ostavljaju Tombstone sa istom sekvencom. Klijent čuva poslednji "seq" iz odgovora
+# i sledeći put traži samo ono što je novije.
+
+# Tombstone.entity -> ključ u "deleted"
+DELETED_KEYS = {"transaction": "transactions", "category": "categories", "budget": "budgets"}
+
+
+def record_deletion(uid: int, entity: str, entity_id: int, seq: int):
+    """Beleži brisanje reda za /api/sync. Poziva se pre commit-a, u istoj sesiji kao brisanje."""
+    db.session.add(Tombstone(user_id=uid, entity=entity, entity_id=entity_id, seq=seq))
+
+
+def _changed(columns, model, uid, since):
+    q = select(*columns).where(model.user_id == uid)
+    if since is not None:
+        q = q.where(model.seq > since)
+    if model is Transaction:
+        q = union_archive(q, uid)  # arhivirani redovi zadržavaju seq
+    return db.session.execute(q.order_by(q.selected_columns.seq, q.selected_columns.id))
+
+
+def _iso(dt):
+    return dt.isoformat() if dt else None
+
+
+@bp_sync.get("/")
+@jwt_required()
+@cached_response
+def sync():
+    """
+    Query params:
+      - since=<seq> (iz prethodnog odgovora); bez njega vraća kompletan snimak.
+        Prva sinhronizacija mora biti bez since – redovi stariji od uvođenja sync-a imaju seq=0.
+    Response:
+      { seq, full, transactions: [...], categories: [...], budgets: [...],
+        deleted: { transactions: [id], categories: [id], budgets: [id] } }
+    Redovi imaju ista polja kao odgovarajuće liste + seq i updated_at.
+    """
+    uid = current_user_id()
+    if not uid:
+        return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
+
+    since = request.args.get("since")
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return {"message": "since mora biti integer"}, 400
+        if since < 0:
+            return {"message": "since mora biti >= 0"}, 400
+
+    # verzija se čita pre redova, u istoj transakciji: ništa novije od nje neće biti propušteno,
+    # a red koji je commit-ovan u međuvremenu stiže ponovo u sledećoj sinhronizaciji
+    seq = current_data_version(uid)
+    if since is not None and since > seq:
+        since = None  # klijent je ispred servera (npr. vraćena baza) – šalji pun snimak
+
+    transactions = [{
+        "id": r.id, "type": r.type, "amount": from_cents(r.amount_cents), "category_id": r.category_id,
+        "date": r.date.isoformat(), "title": r.title, "note": r.note,
+        "seq": r.seq, "updated_at": _iso(r.updated_at),
+    } for r in _changed(
+        (Transaction.id, Transaction.type, Transaction.amount_cents, Transaction.category_id, Transaction.date,
+         Transaction.title, Transaction.note, Transaction.seq, Transaction.updated_at),
+        Transaction, uid, since,
+    )]
+    categories = [{
+        "id": r.id, "name": r.name, "type": r.type, "seq": r.seq, "updated_at": _iso(r.updated_at),
+    } for r in _changed(
+        (Category.id, Category.name, Category.type, Category.seq, Category.updated_at),
+        Category, uid, since,
+    )]
+    budgets = [{
+        "id": r.id, "category_id": r.category_id, "month": r.month, "limit_amount": from_cents(r.limit_cents),
+        "seq": r.seq, "updated_at": _iso(r.updated_at),
+    } for r in _changed(
+        (Budget.id, Budget.category_id, Budget.month, Budget.limit_cents, Budget.seq, Budget.updated_at),
+        Budget, uid, since,
+    )]
+
+    deleted = {k: [] for k in DELETED_KEYS.values()}
+    if since is not None:
+        rows = db.session.execute(
+            select(Tombstone.entity, Tombstone.entity_id)
+            .where(Tombstone.user_id == uid, Tombstone.seq > since)
+            .order_by(Tombstone.seq)
+        )
+        for entity, entity_id in rows:
+            deleted[DELETED_KEYS[entity]].append(entity_id)
+
+    return {
+        "seq": seq,
+        "full": since is None,
+        "transactions": transactions,
+        "categories": categories,
+        "budgets": budgets,
+        "deleted": deleted,
+    }, 200
@@ -1,34 +1,36 @@
+import base64
+import csv
+import io
+import json
 from datetime import datetime, timezone
-from flask import Blueprint, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, current_app, request, stream_with_context
+from flask_jwt_extended import jwt_required
+from sqlalchemy import and_, insert, or_, select, tuple_, union_all
 from sqlalchemy.exc import IntegrityError
 from .database import db
-from .models import Transaction, Category, User
+from .identity import current_user_id
+from .models import Transaction, Category
+from .rollup import bump_monthly_total, month_key
+from .cache import bump_data_version
+from .events import queue_budget_alerts
+from .search import apply_search
+from .archive import spans_archive, to_archive, union_archive
+from .admission import admission_cost
+from .utils import format_cents, from_cents, to_cents
 
 bp_tx = Blueprint("transactions", __name__)  # url_prefix se postavlja u __init__.py
 
-# --- helper: izvući user_id iz JWT (radi i kad je identity email ili dict) ---
-def _get_current_user_id():
-    ident = get_jwt_identity()
-    if isinstance(ident, int):
-        return ident
-    if isinstance(ident, dict):
-        if isinstance(ident.get("id"), int):
-            return ident["id"]
-        sub = ident.get("sub")
-        if isinstance(sub, int):
-            return sub
-        if isinstance(sub, str) and "@" in sub:
-            u = User.query.filter_by(email=sub).first()
-            return u.id if u else None
-    if isinstance(ident, str):
-        try:
-            return int(ident)
-        except ValueError:
-            if "@" in ident:
-                u = User.query.filter_by(email=ident).first()
-                return u.id if u else None
-    return None
+MAX_PAGE_LIMIT = 500
+MAX_IMPORT_ERRORS = 1000  # izveštaj o greškama se seče posle ovoliko redova
+EXPORT_BATCH_SIZE = 1000  # redova po fetch-u sa server-side kursora
+
+EXPORT_COLUMNS = ("id", "type", "amount", "category_id", "date", "title", "note")  # zaglavlje CSV-a
+
+# kolone za čitanje lista/exporta – redovi (Row) umesto ORM entiteta, bez identity map-e
+TX_COLUMNS = (
+    Transaction.id, Transaction.type, Transaction.amount_cents, Transaction.category_id,
+    Transaction.date, Transaction.title, Transaction.note,
+)
 
 # --- helper: ISO string -> naive UTC datetime (tz removed) ---
 def _parse_iso_naive_utc(s: str) -> datetime | None:
@@ -42,22 +44,45 @@ def _parse_iso_naive_utc(s: str) -> datetime | None:
     except Exception:
         return None
 
-@bp_tx.get("/")
-@jwt_required()
-def list_tx():
-    uid = _get_current_user_id()
-    if not uid:
-        return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
+# --- helper: keyset kursor = base64("<date iso>|<id>[|<rank>]") poslednjeg reda na strani ---
+def _encode_cursor(dt: datetime, tx_id: int, rank: float | None = None) -> str:
+    raw = f"{dt.isoformat()}|{tx_id}" + (f"|{rank!r}" if rank is not None else "")
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(s: str):
+    try:
+        raw = base64.urlsafe_b64decode(s + "=" * (-len(s) % 4)).decode()
+        parts = raw.split("|")
+        rank = float(parts[2]) if len(parts) > 2 else None
+        return datetime.fromisoformat(parts[0]), int(parts[1]), rank
+    except Exception:
+        return None
+
+def _tx_to_dict(x):
+    # radi i za Transaction entitet i za Row iz select(*TX_COLUMNS)
+    return {
+        "id": x.id,
+        "type": x.type,
+        "amount": from_cents(x.amount_cents),
+        "category_id": x.category_id,
+        "date": x.date.isoformat(),
+        "title": x.title,
+        "note": x.note,
+    }
 
-    q = Transaction.query.filter_by(user_id=uid)
+# --- helper: WHERE uslovi iz query parametara (type, category_id, from/to) – zajednički za listu i export ---
+# vraća (uslovi, početak opsega ili None, greška); početak odlučuje da li upit zalazi u arhivu
+def _tx_filters(uid):
+    criteria = [Transaction.user_id == uid]
+    start = None
 
     t = request.args.get("type")
     if t in ("INCOME", "EXPENSE"):
-        q = q.filter_by(type=t)
+        criteria.append(Transaction.type == t)
 
     cid = request.args.get("category_id", type=int)
     if cid:
-        q = q.filter_by(category_id=cid)
+        criteria.append(Transaction.category_id == cid)
 
     dfrom = request.args.get("from") or request.args.get("date_from")
     dto   = request.args.get("to")   or request.args.get("date_to")
@@ -65,30 +90,99 @@ def list_tx():
     if dfrom:
         dfp = _parse_iso_naive_utc(dfrom)
         if not dfp:
-            return {"message": "date_from/from nije validan ISO datetime"}, 400
-        q = q.filter(Transaction.date >= dfp)
+            return None, None, "date_from/from nije validan ISO datetime"
+        criteria.append(Transaction.date >= dfp)
+        start = dfp
 
     if dto:
         dtp = _parse_iso_naive_utc(dto)
         if not dtp:
-            return {"message": "date_to/to nije validan ISO datetime"}, 400
-        q = q.filter(Transaction.date <= dtp)
+            return None, None, "date_to/to nije validan ISO datetime"
+        criteria.append(Transaction.date <= dtp)
 
-    items = q.order_by(Transaction.date.desc(), Transaction.id.desc()).all()
-    return [{
-        "id": x.id,
-        "type": x.type,
-        "amount": float(x.amount),
-        "category_id": x.category_id,
-        "date": x.date.isoformat(),
-        "title": x.title,
-        "note": x.note,
-    } for x in items], 200
+    return criteria, start, None
+
+@bp_tx.get("/")
+@admission_cost(2)  # bez limit-a vraća celu listu
+@jwt_required()
+def list_tx():
+    uid = current_user_id()
+    if not uid:
+        return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
+
+    criteria, start, err = _tx_filters(uid)
+    if err:
+        return {"message": err}, 400
+    base = select(*TX_COLUMNS).where(*criteria)
+    limit = request.args.get("limit")
+    cursor = request.args.get("cursor")
+    paged = limit is not None or cursor is not None
+
+    # grane upita: (select, izraz_ranga) nad transaction, plus ista nad arhivom ako opseg zalazi u nju
+    archived = spans_archive(uid, start)
+    text = (request.args.get("q") or "").strip()
+    if text:
+        # full-text pretraga (?q=): rang (manji = bolji) ide ispred (date, id) u sortiranju
+        q, rank = apply_search(base, db.session.get_bind().dialect.name, text)
+        if q is None:  # nema nijedne reči za pretragu
+            return ({"items": [], "next_cursor": None} if paged else []), 200
+        # arhiva nema FTS indeks: LIKE sa rangom 0, pa arhivski pogoci dolaze posle hot pogodaka
+        arms = [(q, rank)] + ([apply_search(base, "", text)] if archived else [])
+    else:
+        rank = None
+        arms = [(base, None)] + ([(base, None)] if archived else [])
+
+    if paged:
+        # keyset paginacija: seek na (date, id) umesto OFFSET-a
+        try:
+            limit = int(limit) if limit is not None else 50
+        except ValueError:
+            return {"message": "limit mora biti integer"}, 400
+        if limit < 1:
+            return {"message": "limit mora biti >= 1"}, 400
+        limit = min(limit, MAX_PAGE_LIMIT)
+
+    seek = None
+    if cursor:
+        key = _decode_cursor(cursor)
+        if not key or (key[2] is None) != (rank is None):
+            return {"message": "cursor nije validan"}, 400
+        d, i, r = key
+        after = tuple_(Transaction.date, Transaction.id) < (d, i)
+
+        def seek(rk):
+            return after if rk is None else or_(rk > r, and_(rk == r, after))
+
+    parts = []
+    for n, (arm, rk) in enumerate(arms):
+        if rk is not None:
+            arm = arm.add_columns(rk.label("rank"))
+        if seek is not None:
+            arm = arm.where(seek(rk))
+        parts.append(to_archive(arm) if n else arm)
+    q = union_all(*parts) if len(parts) > 1 else parts[0]
+    cols = q.selected_columns
+    q = q.order_by(*([cols.rank] if rank is not None else []), cols.date.desc(), cols.id.desc())
+
+    # bez limit/cursor -> stari odgovor (cela lista), radi kompatibilnosti sa frontendom
+    if not paged:
+        return [_tx_to_dict(x) for x in db.session.execute(q)], 200
+
+    # uzmi jedan red više da znamo da li postoji sledeća strana
+    rows = db.session.execute(q.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = _encode_cursor(last.date, last.id, last.rank if rank is not None else None)
+
+    return {"items": [_tx_to_dict(x) for x in rows], "next_cursor": next_cursor}, 200
 
 @bp_tx.post("/")
 @jwt_required()
 def create_tx():
-    uid = _get_current_user_id()
+    uid = current_user_id()
     if not uid:
         return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
 
@@ -98,12 +192,12 @@ def create_tx():
     if type_ not in ("INCOME", "EXPENSE"):
         return {"message": "type mora biti INCOME ili EXPENSE"}, 400
 
-    # amount
+    # amount (u bazi celi centi)
     try:
-        amount_num = float(data.get("amount"))
-    except (TypeError, ValueError):
+        cents = to_cents(data.get("amount"))
+    except ValueError:
         return {"message": "amount mora biti broj"}, 400
-    if amount_num < 0:
+    if cents < 0:
         return {"message": "amount mora biti >= 0"}, 400
 
     # category_id
@@ -129,23 +223,235 @@ def create_tx():
         category_id=cat.id,
         type=type_,
         title=title,
-        amount=amount_num,
+        amount_cents=cents,
         date=dt,
         note=note,
     )
     try:
+        tx.seq = bump_data_version(uid)  # sekvenca izmene za /api/sync
         db.session.add(tx)
+        total = bump_monthly_total(uid, dt, cat.id, type_, cents)  # ista DB transakcija kao i insert
+        if type_ == "EXPENSE":
+            queue_budget_alerts(uid, month_key(dt), cat.id, total - cents, total)
         db.session.commit()
     except IntegrityError as e:
         db.session.rollback()
         return {"message": f"Greška pri upisu transakcije: {str(e)}"}, 400
 
+    return _tx_to_dict(tx), 201
+
+# --- export (CSV ili NDJSON), strimovano bez ORM entiteta ---
+
+def _export_chunks(stmt, fmt):
+    # yield_per -> server-side kursor (stream_results); memorija ostaje konstantna
+    result = db.session.execute(stmt, execution_options={"yield_per": EXPORT_BATCH_SIZE})
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buf.getvalue()
+    for part in result.partitions():
+        if fmt == "csv":
+            buf.seek(0)
+            buf.truncate()
+            writer.writerows(
+                (r.id, r.type, format_cents(r.amount_cents), r.category_id, r.date.isoformat(), r.title or "", r.note or "")
+                for r in part
+            )
+            yield buf.getvalue()
+        else:
+            yield "".join(
+                json.dumps({
+                    "id": r.id, "type": r.type, "amount": from_cents(r.amount_cents), "category_id": r.category_id,
+                    "date": r.date.isoformat(), "title": r.title, "note": r.note,
+                }, ensure_ascii=False) + "\n"
+                for r in part
+            )
+
+@bp_tx.get("/export")
+@admission_cost(5)  # strimovan export; cena po zahtevu, ne po redu
+@jwt_required()
+def export_tx():
+    """
+    Query params: format=csv|ndjson (podrazumevano csv) + isti filteri kao lista (type, category_id, from/to).
+    Odgovor se strimuje u paketima od EXPORT_BATCH_SIZE redova.
+    """
+    uid = current_user_id()
+    if not uid:
+        return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
+
+    fmt = (request.args.get("format") or "csv").lower()
+    if fmt not in ("csv", "ndjson"):
+        return {"message": "format mora biti csv ili ndjson"}, 400
+
+    criteria, start, err = _tx_filters(uid)
+    if err:
+        return {"message": err}, 400
+
+    stmt = union_archive(select(*TX_COLUMNS).where(*criteria), uid, start)
+    cols = stmt.selected_columns
+    stmt = stmt.order_by(cols.date.desc(), cols.id.desc())
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(
+        stream_with_context(_export_chunks(stmt, fmt)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{fmt}"'},
+    )
+
+# --- bulk import (CSV ili NDJSON), strimovano i u paketima ---
+
+class _RawBody(io.RawIOBase):
+    # request.stream kao io "raw" tok – gunicorn-ov Body nema readable()/readinto() koje TextIOWrapper traži
+    def __init__(self, stream):
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        data = self._stream.read(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+def _iter_import_rows(fmt: str):
+    # čita telo zahteva red po red; nikad ne drži ceo upload u memoriji
+    text = io.TextIOWrapper(io.BufferedReader(_RawBody(request.stream)), encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for n, row in enumerate(reader, start=1):
+            yield n, row, None
+        return
+    for n, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            yield n, None, "red nije validan JSON"
+            continue
+        if not isinstance(obj, dict):
+            yield n, None, "red mora biti JSON objekat"
+            continue
+        yield n, obj, None
+
+def _validate_import_row(uid, data, cats_by_id, cats_by_name):
+    # vraća (values, None) ili (None, poruka) – ista pravila kao create_tx
+    for key in ("type", "title", "note"):  # NDJSON može doneti broj/listu/objekat
+        if data.get(key) is not None and not isinstance(data[key], str):
+            return None, f"{key} mora biti string"
+    cat = None
+    raw_cid = data.get("category_id")
+    if raw_cid not in (None, ""):
+        try:
+            cat = cats_by_id.get(int(raw_cid))
+        except (TypeError, ValueError):
+            return None, "category_id mora biti integer"
+    elif data.get("category"):
+        cat = cats_by_name.get(str(data["category"]).strip().lower())
+    if not cat:
+        return None, "Kategorija ne postoji ili ne pripada korisniku"
+    cat_id, cat_type = cat
+
+    type_ = (data.get("type") or cat_type).strip().upper()
+    if type_ not in ("INCOME", "EXPENSE"):
+        return None, "type mora biti INCOME ili EXPENSE"
+    if cat_type != type_:
+        return None, f"Tip transakcije ({type_}) ne odgovara tipu kategorije ({cat_type})"
+
+    try:
+        cents = to_cents(data.get("amount"))
+    except ValueError:
+        return None, "amount mora biti broj"
+    if cents < 0:
+        return None, "amount mora biti >= 0"
+
+    raw_date = data.get("date")
+    dt = _parse_iso_naive_utc(raw_date)
+    if raw_date and not dt:
+        return None, "date nije validan ISO datetime"
+
+    return {
+        "user_id": uid,
+        "category_id": cat_id,
+        "type": type_,
+        "title": (data.get("title") or "").strip() or None,
+        "amount_cents": cents,
+        "date": dt or datetime.utcnow(),
+        "note": (data.get("note") or "").strip() or None,
+    }, None
+
+def _flush_import_chunk(uid, chunk):
+    # jedan executemany INSERT + rollup delte agregirane po (mesec, kategorija, tip), pa commit;
+    # ceo paket dobija istu sekvencu izmene
+    seq = bump_data_version(uid)
+    for v in chunk:
+        v["seq"] = seq
+    db.session.execute(insert(Transaction.__table__), chunk)
+    deltas = {}
+    for v in chunk:
+        key = (v["date"].strftime("%Y-%m"), v["category_id"], v["type"])
+        total, count = deltas.get(key, (0, 0))
+        deltas[key] = (total + v["amount_cents"], count + 1)
+    for (month, cat_id, type_), (total, count) in deltas.items():
+        after = bump_monthly_total(uid, datetime.strptime(month, "%Y-%m"), cat_id, type_, total, count)
+        if type_ == "EXPENSE":
+            queue_budget_alerts(uid, month, cat_id, after - total, after)
+    db.session.commit()
+
+@bp_tx.post("/import")
+@admission_cost(10)  # strimovan import u paketima
+@jwt_required()
+def import_tx():
+    """
+    Body: CSV (Content-Type: text/csv, sa header-om) ili NDJSON (application/x-ndjson),
+    kolone/polja: type, amount, category_id ili category (ime), date, title, note.
+    Format se može zadati i sa ?format=csv|ndjson.
+    Response: { inserted, failed, errors: [{row, message}], errors_truncated }
+    """
+    uid = current_user_id()
+    if not uid:
+        return {"message": "Nevažeći token ili korisnik ne postoji"}, 401
+
+    fmt = (request.args.get("format") or "").lower()
+    if not fmt:
+        ctype = (request.mimetype or "").lower()
+        fmt = "csv" if ctype in ("text/csv", "application/csv") else "ndjson" if "ndjson" in ctype or "jsonl" in ctype else ""
+    if fmt not in ("csv", "ndjson"):
+        return {"message": "format mora biti csv ili ndjson"}, 415
+
+    # sve kategorije korisnika jednim upitom -> mapa u memoriji
+    cats_by_id, cats_by_name = {}, {}
+    for cid, name, ctype in db.session.query(Category.id, Category.name, Category.type).filter_by(user_id=uid):
+        cats_by_id[cid] = (cid, ctype)
+        cats_by_name[name.strip().lower()] = (cid, ctype)
+
+    chunk_size = current_app.config["IMPORT_CHUNK_SIZE"]
+    chunk, errors = [], []
+    inserted = failed = 0
+
+    for n, data, err in _iter_import_rows(fmt):
+        values = None
+        if not err:
+            values, err = _validate_import_row(uid, data, cats_by_id, cats_by_name)
+        if err:
+            failed += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append({"row": n, "message": err})
+            continue
+        chunk.append(values)
+        if len(chunk) >= chunk_size:
+            _flush_import_chunk(uid, chunk)
+            inserted += len(chunk)
+            chunk = []
+
+    if chunk:
+        _flush_import_chunk(uid, chunk)
+        inserted += len(chunk)
+
     return {
-        "id": tx.id,
-        "type": tx.type,
-        "amount": float(tx.amount),
-        "category_id": tx.category_id,
-        "date": tx.date.isoformat(),
-        "title": tx.title,
-        "note": tx.note,
-    }, 201
\ No newline at end of file
+        "inserted": inserted,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }, 200
@@ -0,0 +1,58 @@
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+
+def month_range(yyyy_mm: str):
+    # yyyy_mm -> (start, end) kao poluotvoren opseg [start, end) – end je prvi dan sledećeg meseca
+    try:
+        y, m = map(int, (yyyy_mm or "").split("-"))
+        start = datetime(y, m, 1)
+        end = datetime(y + 1, 1, 1) if m == 12 else datetime(y, m + 1, 1)
+        return start, end
+    except Exception:
+        return None, None
+
+
+def add_months(d, n: int):
+    # prvi dan meseca pomeren za n meseci (n može biti negativno)
+    y, m = divmod(d.year * 12 + d.month - 1 + n, 12)
+    return d.replace(year=y, month=m + 1, day=1)
+
+
+def parse_date(s: str):
+    # 'YYYY-MM-DD' (ili ISO datetime) -> date
+    try:
+        return date.fromisoformat((s or "")[:10])
+    except ValueError:
+        return None
+
+
+# Novac se u bazi čuva kao ceo broj centi (BigInteger); API i dalje prima/vraća iznose u dinarima.
+MAX_CENTS = 10 ** 14  # isto ograničenje kao nekadašnji Numeric(14, 2)
+
+
+def to_cents(value) -> int:
+    # broj ili string iz API-ja/CSV-a -> ceo broj centi (zaokruženo half-up); ValueError za nevalidan unos
+    if value is None or isinstance(value, bool):
+        raise ValueError("iznos je obavezan")
+    try:
+        d = value if isinstance(value, Decimal) else Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError("iznos nije broj")
+    if not d.is_finite():
+        raise ValueError("iznos nije konačan broj")
+    if abs(d) * 100 >= MAX_CENTS:
+        raise ValueError("iznos je prevelik")
+    return int((d * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents) -> float:
+    # centi -> dinari za JSON; jedno deljenje daje float čiji je zapis tačno ta decimalna vrednost
+    return (cents or 0) / 100
+
+
+def format_cents(cents) -> str:
+    # centi -> '1234.50' (CSV izvoz), bez prolaska kroz float
+    sign = "-" if cents < 0 else ""
+    whole, frac = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{frac:02d}"
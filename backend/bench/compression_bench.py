@@ -0,0 +1,113 @@
+"""Kompresija odgovora: CPU naspram bajtova na žici, po kodeku i nivou.
+
+Priprema kao za run_bench.py (sintetička baza, DATABASE_URL). Pokretanje iz backend/:
+    python bench/compression_bench.py
+    python bench/compression_bench.py --iterations 30 --out bench/compression.json
+
+Za svaku rutu i varijantu (identity, gzip 1/6/9, br 1/4/9 ako je brotli instaliran)
+meri p50 latenciju kroz test klijent, veličinu tela i čisto CPU vreme kompresije
+istog tela (time.process_time), pa se vidi koliko ms košta svaki ušteđeni KB.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+from datetime import datetime
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from run_bench import _params, percentile  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROUTES = [
+    ("transactions.month", "/api/transactions/?from={start}&to={end}"),
+    ("transactions.export", "/api/transactions/export?format=ndjson&from={start}&to={end}"),
+    ("overview.series.day", "/api/overview/series?bucket=day&from={month}-01&to={month}-28"),
+]
+
+
+def _variants():
+    out = [("identity", None, None)]
+    out += [(f"gzip-{lvl}", "gzip", lvl) for lvl in (1, 6, 9)]
+    if brotli is not None:
+        out += [(f"br-{q}", "br", q) for q in (1, 4, 9)]  # 10-11 su sekunde po MB – nisu za online odgovore
+    return out
+
+
+def _cpu_ms(body, encoding, level, repeat=5):
+    t0 = time.process_time()
+    for _ in range(repeat):
+        if encoding == "gzip":
+            c = zlib.compressobj(level, zlib.DEFLATED, 31)
+            c.compress(body) + c.flush()
+        elif encoding == "br":
+            brotli.compress(body, quality=level)
+    return (time.process_time() - t0) / repeat * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--user", default="synth-0@example.com")
+    ap.add_argument("--month", default=datetime.utcnow().strftime("%Y-%m"))
+    ap.add_argument("--iterations", type=int, default=20)
+    ap.add_argument("--out", help="Sačuvaj rezultate u JSON.")
+    args = ap.parse_args()
+
+    os.environ.setdefault("RESPONSE_CACHE_BACKEND", "none")
+    os.environ.setdefault("ADMISSION_BACKEND", "none")
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.models import User
+
+    app = create_app()
+    client = app.test_client()
+    with app.app_context():
+        user = User.query.filter_by(email=args.user).first()
+        if not user:
+            sys.exit(f"korisnik {args.user} ne postoji – pokreni 'flask seed-synthetic'")
+        token = create_access_token(identity=str(user.id))
+    params = _params(args.month)
+
+    results = {}
+    for name, path in ROUTES:
+        url = path.format(**params)
+        raw = client.get(url, headers={"Authorization": f"Bearer {token}"}).get_data()
+        print(f"\n{name}: {len(raw) / 1024:.1f} KB nekompresovano")
+        results[name] = {}
+        for label, encoding, level in _variants():
+            headers = {"Authorization": f"Bearer {token}"}
+            if encoding:
+                headers["Accept-Encoding"] = encoding
+                app.config["COMPRESSION_LEVEL" if encoding == "gzip" else "COMPRESSION_BROTLI_QUALITY"] = level
+            durations, size = [], 0
+            for _ in range(args.iterations):
+                t0 = time.perf_counter()
+                resp = client.get(url, headers=headers)
+                size = len(resp.get_data())
+                durations.append(time.perf_counter() - t0)
+            durations.sort()
+            r = {
+                "bytes": size,
+                "ratio": size / len(raw) if raw else None,
+                "p50_ms": percentile(durations, 50) * 1000,
+                "compress_cpu_ms": _cpu_ms(raw, encoding, level) if encoding else 0.0,
+            }
+            results[name][label] = r
+            print(f"  {label:9s} {r['bytes'] / 1024:9.1f} KB  ({r['ratio']:6.1%})  "
+                  f"p50={r['p50_ms']:8.2f}ms  cpu={r['compress_cpu_ms']:7.2f}ms")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"month": args.month, "iterations": args.iterations, "routes": results}, f, indent=2)
+        print(f"rezultati sačuvani u {args.out}")
+
+
+if __name__ == "__main__":
+    main()
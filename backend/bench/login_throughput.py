@@ -0,0 +1,69 @@
+"""Login throughput: heširanje u samom worker-u vs. u pool-u procesa.
+
+Pokretanje (iz backend/):
+    python bench/login_throughput.py --requests 60 --concurrency 6 --pool-workers 2
+
+Koristi privremenu SQLite bazu (ili DATABASE_URL), za svaki scenario registruje
+korisnika i zatim iz N niti šalje POST /api/auth/login preko Flask test klijenta.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+PASSWORD = "Bench1234!"
+
+
+def run(workers, slots, requests, concurrency, method):
+    from app import create_app
+    from app.database import db
+
+    app = create_app()
+    app.config.update(PASSWORD_HASH_WORKERS=workers, PASSWORD_HASH_SLOTS=slots, PASSWORD_HASH_METHOD=method)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    email = f"bench-{workers}@example.com"
+    r = client.post("/api/auth/register", json={"email": email, "name": "Bench", "password": PASSWORD})
+    assert r.status_code == 201, r.get_json()
+
+    def login(_):
+        t0 = time.perf_counter()
+        status = client.post("/api/auth/login", json={"email": email, "password": PASSWORD}).status_code
+        return status, time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        results = list(ex.map(login, range(requests)))
+    elapsed = time.perf_counter() - t0
+
+    ok = [d for s, d in results if s == 200]
+    shed = sum(1 for s, _ in results if s == 503)
+    lat = sorted(ok)
+    p95 = lat[int(len(lat) * 0.95) - 1] if lat else 0.0
+    return {"ok": len(ok), "shed_503": shed, "elapsed_s": elapsed, "logins_per_s": len(ok) / elapsed, "p95_s": p95}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--requests", type=int, default=60)
+    ap.add_argument("--concurrency", type=int, default=6)
+    ap.add_argument("--pool-workers", type=int, default=2)
+    ap.add_argument("--slots", type=int, default=64, help="PASSWORD_HASH_SLOTS (0 = bez limita).")
+    ap.add_argument("--method", default="scrypt:32768:8:1")
+    args = ap.parse_args()
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + tempfile.mktemp(suffix=".db"))
+    os.environ.setdefault("ADMISSION_BACKEND", "none")  # meri se heširanje, ne rate limit
+
+    for label, workers in (("inline (pre)", 0), (f"pool x{args.pool_workers} (posle)", args.pool_workers)):
+        res = run(workers, args.slots, args.requests, args.concurrency, args.method)
+        print(f"{label:22s} {res['logins_per_s']:8.1f} login/s  p95={res['p95_s'] * 1000:7.1f} ms  "
+              f"ok={res['ok']} 503={res['shed_503']}")
+
+
+if __name__ == "__main__":
+    main()
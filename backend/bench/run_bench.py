@@ -0,0 +1,381 @@
+"""Benchmark svih /api/* ruta: p50/p95/p99, throughput i broj SQL upita po ruti.
+
+Priprema (iz backend/):
+    export DATABASE_URL=sqlite:////tmp/bench.db
+    flask --app app db upgrade
+    flask --app app seed-synthetic --users 2 --transactions 200000 --seed 1
+
+Pokretanje:
+    python bench/run_bench.py --out bench/results.json
+    python bench/run_bench.py --compare bench/results.json            # pada ako p95 poraste > 20%
+    python bench/run_bench.py --gunicorn --workers 3 --concurrency 8  # kroz pravi gunicorn
+
+U --gunicorn režimu SQL upiti se ne broje (drugi procesi). Keš odgovora je podrazumevano
+isključen, pa se meri sam upit; RESPONSE_CACHE_BACKEND=memory meri pogotke keša
+(npr. ... --out nocache.json, pa RESPONSE_CACHE_BACKEND=memory ... --compare nocache.json).
+orjson provider se isključuje sa FAST_JSON=0 na isti način.
+
+Rute koje pišu (register, kreiranje kategorija/budžeta/transakcija, import) ostavljaju
+"bench-*" redove u bazi; update/delete budžeta dobijaju sveže budžete pre svakog merenja.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+# benchmark namerno "napada" rute – rate limit bi merio 429 umesto rute (ADMISSION_BACKEND=sqlite ga vraća),
+# keš odgovora bi merio pogotke umesto upita, a limit heširanja 503 umesto login-a
+os.environ.setdefault("ADMISSION_BACKEND", "none")
+os.environ.setdefault("RESPONSE_CACHE_BACKEND", "none")
+os.environ.setdefault("PASSWORD_HASH_SLOTS", "0")
+os.environ.setdefault("SSE_STREAMING", "never")  # /api/events isporuči zaostale događaje i zatvori se
+
+# (ime, metoda, putanja, telo) – {month}, {start}, {end}, {from_month}, {since} se popunjavaju pre merenja,
+# {budget} svežim budžetom za svaki zahtev (vidi _make_budgets)
+ENDPOINTS = [
+    ("health", "GET", "/api/health", None),
+    ("metrics", "GET", "/api/metrics", None),
+    ("auth.me", "GET", "/api/auth/me", None),
+    ("auth.login", "POST", "/api/auth/login", "login"),
+    ("auth.register", "POST", "/api/auth/register", "register"),
+    ("categories.list", "GET", "/api/categories/", None),
+    ("categories.create", "POST", "/api/categories/", "category"),
+    ("budgets.list", "GET", "/api/budgets/", None),
+    ("budgets.create", "POST", "/api/budgets/", "budget"),
+    ("budgets.update", "PATCH", "/api/budgets/{budget}", "budget_update"),
+    ("budgets.delete", "DELETE", "/api/budgets/{budget}", None),
+    ("budgets.summary", "GET", "/api/budgets/summary?month={month}", None),
+    ("budgets.summary.range", "GET", "/api/budgets/summary?from_month={from_month}&to_month={month}", None),
+    ("overview", "GET", "/api/overview/?month={month}", None),
+    ("overview.series", "GET", "/api/overview/series?bucket=month", None),
+    ("overview.series.day", "GET", "/api/overview/series?from={start}&to={end}&bucket=day", None),
+    ("forecast", "GET", "/api/forecast/?month={month}", None),
+    ("sync.delta", "GET", "/api/sync/?since={since}", None),
+    ("events", "GET", "/api/events/", None),
+    ("transactions.month", "GET", "/api/transactions/?from={start}&to={end}", None),
+    ("transactions.page", "GET", "/api/transactions/?limit=50", None),
+    ("transactions.search", "GET", "/api/transactions/?q=restoran&limit=50", None),
+    ("transactions.export", "GET", "/api/transactions/export?format=ndjson&from={start}&to={end}", None),
+    ("transactions.create", "POST", "/api/transactions/", "tx"),
+    ("transactions.import", "POST", "/api/transactions/import", "import"),
+]
+
+IMPORT_ROWS = 100  # redova po import zahtevu
+
+
+def percentile(sorted_vals, p):
+    if not sorted_vals:
+        return None
+    k = max(0, min(len(sorted_vals) - 1, int(round(p / 100 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+
+def summarize(durations, wall, sql_counts, errors):
+    d = sorted(durations)
+    out = {
+        "n": len(d),
+        "errors": errors,
+        "mean_ms": sum(d) / len(d) * 1000 if d else None,
+        "p50_ms": percentile(d, 50) * 1000 if d else None,
+        "p95_ms": percentile(d, 95) * 1000 if d else None,
+        "p99_ms": percentile(d, 99) * 1000 if d else None,
+        "rps": len(d) / wall if wall else None,
+        "sql_per_request": (sum(sql_counts) / len(sql_counts)) if sql_counts else None,
+    }
+    return out
+
+
+def _params(month, since):
+    y, m = map(int, month.split("-"))
+    ny, nm = (y + 1, 1) if m == 12 else (y, m + 1)
+    fy, fm = divmod(y * 12 + m - 1 - 11, 12)
+    return {"month": month, "start": f"{month}-01T00:00:00", "end": f"{ny:04d}-{nm:02d}-01T00:00:00",
+            "from_month": f"{fy:04d}-{fm + 1:02d}", "since": since}
+
+
+def _bench_month(i):
+    # meseci daleko u budućnosti – ne mešaju se sa sintetičkim budžetima
+    return f"{2100 + i // 12:04d}-{i % 12 + 1:02d}"
+
+
+def _bodies(email, password, cat_id, bench_cat_id, month, run):
+    """Ime tela -> f(i) koja vraća JSON telo (dict) ili sirovo NDJSON telo (str) za i-ti zahtev."""
+    def import_body(i):
+        return "\n".join(json.dumps({
+            "type": "EXPENSE", "amount": 10 + k, "category_id": cat_id,
+            "date": f"{month}-10T08:00:00", "title": f"bench import {i}",
+        }) for k in range(IMPORT_ROWS))
+
+    return {
+        "login": lambda i: {"email": email, "password": password},
+        "register": lambda i: {"email": f"bench-{run}-{i}@example.com", "name": "Bench", "password": password},
+        "category": lambda i: {"name": f"bench-{run}-{i}", "type": "EXPENSE"},
+        "budget": lambda i: {"category_id": bench_cat_id, "month": _bench_month(i), "limit_amount": 100},
+        "budget_update": lambda i: {"limit_amount": 150 + i},
+        "tx": lambda i: {"type": "EXPENSE", "amount": 123.45, "category_id": cat_id,
+                         "date": f"{month}-15T12:00:00Z", "title": "bench"},
+        "import": import_body,
+    }
+
+
+def _request_body(bodies, body, i):
+    """(json, data, content_type) za client.open / _http."""
+    if body is None:
+        return None, None, None
+    payload = bodies[body](i)
+    if isinstance(payload, str):
+        return None, payload.encode(), "application/x-ndjson"
+    return payload, None, None
+
+
+def _prepare(app, email, run):
+    """Podaci za merenje iz baze: korisnik, kategorije i funkcija koja pravi sveže budžete."""
+    from app.cache import bump_data_version
+    from app.database import db
+    from app.models import Budget, Category, User
+
+    with app.app_context():
+        user = User.query.filter_by(email=email).first()
+        if not user:
+            sys.exit(f"korisnik {email} ne postoji – pokreni 'flask seed-synthetic'")
+        cat = Category.query.filter_by(user_id=user.id, type="EXPENSE").first()
+        # budžeti bench-a idu u zasebnu kategoriju – ponovljena merenja ne udaraju u postojeće (409)
+        bench_cat = Category(user_id=user.id, name=f"bench-budgets-{run}", type="EXPENSE", seq=bump_data_version(user.id))
+        db.session.add(bench_cat)
+        db.session.commit()
+        uid, cat_id, bench_cat_id, seq = user.id, cat.id, bench_cat.id, user.data_version
+    offset = [0]
+
+    def make_budgets(n):
+        # n svežih budžeta (za update/delete), meseci posle onih koje pravi budgets.create
+        with app.app_context():
+            seq = bump_data_version(uid)
+            rows = [Budget(user_id=uid, category_id=bench_cat_id, month=_bench_month(1000 + offset[0] + k),
+                           limit_cents=10000, seq=seq) for k in range(n)]
+            db.session.add_all(rows)
+            db.session.commit()
+            offset[0] += n
+            return [b.id for b in rows]
+
+    return uid, cat_id, bench_cat_id, max(0, seq - 10), make_budgets
+
+
+# — režim 1: Flask test client (u procesu, broji SQL upite) —
+
+def run_test_client(args):
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event
+    from app import create_app
+    from app.database import db
+
+    app = create_app()
+    client = app.test_client()
+    run = int(time.time())
+    uid, cat_id, bench_cat_id, since, make_budgets = _prepare(app, args.user, run)
+    with app.app_context():
+        token = create_access_token(identity=str(uid))
+        engine = db.engine
+
+    counter = [0]
+
+    def _count(*_a):
+        counter[0] += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    headers = {"Authorization": f"Bearer {token}"}
+    params = _params(args.month, since)
+    bodies = _bodies(args.user, args.password, cat_id, bench_cat_id, args.month, run)
+
+    results = {}
+    for name, method, path, body in ENDPOINTS:
+        if args.only and name not in args.only:
+            continue
+        total = args.warmup + args.iterations
+        budgets = make_budgets(total) if "{budget}" in path else [None] * total
+        durations, sql_counts, errors = [], [], 0
+
+        def send(i):
+            json_body, data, ctype = _request_body(bodies, body, i)
+            url = path.format(budget=budgets[i], **params)
+            return client.open(url, method=method, headers=headers, json=json_body, data=data, content_type=ctype)
+
+        for i in range(args.warmup):
+            send(i).get_data()
+        t_wall = time.perf_counter()
+        for i in range(args.warmup, total):
+            counter[0] = 0
+            t0 = time.perf_counter()
+            resp = send(i)
+            resp.get_data()  # strimovani odgovori se mere do poslednjeg bajta
+            durations.append(time.perf_counter() - t0)
+            sql_counts.append(counter[0])
+            if resp.status_code >= 400:
+                errors += 1
+        results[name] = summarize(durations, time.perf_counter() - t_wall, sql_counts, errors)
+        _print_row(name, results[name])
+
+    event.remove(engine, "before_cursor_execute", _count)
+    return results
+
+
+# — režim 2: pravi gunicorn preko HTTP-a —
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _http(base, method, path, headers, body, data=None, content_type=None):
+    if body is not None:
+        data, content_type = json.dumps(body).encode(), "application/json"
+    req = urllib.request.Request(base + path, data=data, method=method, headers=dict(headers))
+    if data is not None:
+        req.add_header("Content-Type", content_type)
+    try:
+        with urllib.request.urlopen(req, timeout=60) as r:
+            r.read()
+            return r.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def run_gunicorn(args):
+    from app import create_app
+
+    run = int(time.time())
+    _, cat_id, bench_cat_id, since, make_budgets = _prepare(create_app(), args.user, run)
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(args.workers), "-b", f"127.0.0.1:{port}", "app:create_app()"],
+        cwd=BACKEND_DIR, env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            try:
+                if _http(base, "GET", "/api/health", {}, None) == 200:
+                    break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            sys.exit("gunicorn se nije podigao")
+
+        req = urllib.request.Request(base + "/api/auth/login", method="POST",
+                                     data=json.dumps({"email": args.user, "password": args.password}).encode(),
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req) as r:
+            token = json.loads(r.read())["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        params = _params(args.month, since)
+        bodies = _bodies(args.user, args.password, cat_id, bench_cat_id, args.month, run)
+        results = {}
+        for name, method, path, body in ENDPOINTS:
+            if args.only and name not in args.only:
+                continue
+            total = args.warmup + args.iterations
+            budgets = make_budgets(total) if "{budget}" in path else [None] * total
+
+            def one(i):
+                json_body, data, ctype = _request_body(bodies, body, i)
+                url = path.format(budget=budgets[i], **params)
+                t0 = time.perf_counter()
+                status = _http(base, method, url, headers, json_body, data, ctype)
+                return time.perf_counter() - t0, status
+
+            with ThreadPoolExecutor(max_workers=args.concurrency) as ex:
+                list(ex.map(one, range(args.warmup)))
+                t_wall = time.perf_counter()
+                res = list(ex.map(one, range(args.warmup, total)))
+                wall = time.perf_counter() - t_wall
+            errors = sum(1 for _, s in res if s >= 400)
+            results[name] = summarize([d for d, _ in res], wall, [], errors)
+            _print_row(name, results[name])
+        return results
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+# — izveštaj i poređenje —
+
+def _fmt(v, spec="8.2f"):
+    return format(v, spec) if v is not None else " " * (int(spec.split(".")[0]) - 1) + "-"
+
+
+def _print_row(name, r):
+    print(f"{name:22s} p50={_fmt(r['p50_ms'])}ms p95={_fmt(r['p95_ms'])}ms p99={_fmt(r['p99_ms'])}ms "
+          f"rps={_fmt(r['rps'], '8.1f')} sql={_fmt(r['sql_per_request'], '5.1f')} err={r['errors']}")
+
+
+def compare(old, new, max_regression):
+    regressions = []
+    for name, r in new["endpoints"].items():
+        o = old.get("endpoints", {}).get(name)
+        if not o or not o.get("p95_ms") or r.get("p95_ms") is None:
+            continue
+        ratio = r["p95_ms"] / o["p95_ms"]
+        sql_delta = (r["sql_per_request"] or 0) - (o.get("sql_per_request") or 0)
+        flag = ""
+        if ratio > 1 + max_regression or sql_delta > 0:
+            flag = "  <-- REGRESIJA"
+            regressions.append(name)
+        print(f"{name:22s} p95 {o['p95_ms']:8.2f} -> {r['p95_ms']:8.2f} ms ({ratio:5.2f}x)  sql {sql_delta:+.1f}{flag}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--user", default="synth-0@example.com")
+    ap.add_argument("--password", default="Synthetic1!")
+    ap.add_argument("--month", default=datetime.utcnow().strftime("%Y-%m"))
+    ap.add_argument("--iterations", type=int, default=50)
+    ap.add_argument("--warmup", type=int, default=3)
+    ap.add_argument("--only", nargs="*", help="Samo navedene rute (imena iz ENDPOINTS).")
+    ap.add_argument("--gunicorn", action="store_true", help="Meri kroz lokalni gunicorn umesto test klijenta.")
+    ap.add_argument("--workers", type=int, default=3)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--out", help="Sačuvaj rezultate u JSON.")
+    ap.add_argument("--compare", help="Prethodni JSON rezultat za poređenje.")
+    ap.add_argument("--max-regression", type=float, default=0.2, help="Dozvoljeni rast p95 (0.2 = 20%%).")
+    args = ap.parse_args()
+
+    endpoints = run_gunicorn(args) if args.gunicorn else run_test_client(args)
+    result = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+            "mode": "gunicorn" if args.gunicorn else "test_client",
+            "iterations": args.iterations,
+            "concurrency": args.concurrency if args.gunicorn else 1,
+            "workers": args.workers if args.gunicorn else None,
+            "database_url": os.getenv("DATABASE_URL", "sqlite:///budget.db"),
+            "python": platform.python_version(),
+        },
+        "endpoints": endpoints,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"rezultati sačuvani u {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        regressions = compare(old, result, args.max_regression)
+        if regressions:
+            sys.exit(f"regresija na: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
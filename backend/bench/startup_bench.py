@@ -0,0 +1,148 @@
+"""Vreme podizanja aplikacije po profilu (full / serve / preload) i čuvar protiv regresija.
+
+Pokretanje (iz backend/, DATABASE_URL kao za run_bench.py):
+    python bench/startup_bench.py
+    python bench/startup_bench.py --runs 9 --out bench/startup.json
+    python bench/startup_bench.py --max-boot-ms 400               # pada ako serve boot (p50) pređe 400 ms
+    python bench/startup_bench.py --gunicorn --workers 3          # i do prvog HTTP odgovora kroz gunicorn
+
+Svako merenje je nov Python proces: uvoz paketa app, create_app(profil), prvi GET /api/health
+i prvi GET /api/forecast/ (sa --user; pokazuje gde se plaća lenjo učitan NumPy). Za serve profil
+proverava i da se Alembic/Flask-Migrate/NumPy ne uvoze pri podizanju.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from run_bench import _free_port, _http, percentile  # noqa: E402
+
+PROFILES = ("full", "serve", "preload")
+
+# moduli koje serving profil ne sme da uveze pri podizanju
+SERVE_FORBIDDEN = ("alembic", "flask_migrate", "numpy")
+
+# jedno merenje u svežem procesu; rezultat kao JSON na poslednjoj liniji stdout-a
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+application = app.create_app(sys.argv[1])
+t2 = time.perf_counter()
+loaded = sorted(m for m in json.loads(sys.argv[3]) if m in sys.modules)
+client = application.test_client()
+client.get("/api/health")
+t3 = time.perf_counter()
+out = {"import_ms": (t1 - t0) * 1000, "create_ms": (t2 - t1) * 1000,
+       "first_response_ms": (t3 - t2) * 1000, "loaded": loaded}
+if sys.argv[2]:
+    from flask_jwt_extended import create_access_token
+    from app.models import User
+    with application.app_context():
+        user = User.query.filter_by(email=sys.argv[2]).first()
+        token = create_access_token(identity=str(user.id)) if user else None
+    if token:
+        t4 = time.perf_counter()
+        client.get("/api/forecast/", headers={"Authorization": f"Bearer {token}"})
+        out["first_forecast_ms"] = (time.perf_counter() - t4) * 1000
+print(json.dumps(out))
+"""
+
+
+def measure(profile, user, runs):
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", CHILD, profile, user or "", json.dumps(SERVE_FORBIDDEN)],
+            cwd=BACKEND_DIR, env=os.environ.copy(), capture_output=True, text=True, check=True,
+        )
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    out = {"loaded": samples[-1]["loaded"]}
+    for key in ("import_ms", "create_ms", "first_response_ms", "first_forecast_ms"):
+        vals = sorted(s[key] for s in samples if key in s)
+        if vals:
+            out[key] = percentile(vals, 50)
+    out["boot_ms"] = out["import_ms"] + out["create_ms"]
+    return out
+
+
+def measure_gunicorn(profile, workers, runs):
+    # od pokretanja procesa do prvog 200 na /api/health
+    cmd = [sys.executable, "-m", "gunicorn", "-w", str(workers)]
+    if profile == "preload":
+        cmd.append("--preload")
+    durations = []
+    for _ in range(runs):
+        port = _free_port()
+        base = f"http://127.0.0.1:{port}"
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(
+            cmd + ["-b", f"127.0.0.1:{port}", f"app:create_app('{profile}')"],
+            cwd=BACKEND_DIR, env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while time.perf_counter() - t0 < 30:
+                try:
+                    if _http(base, "GET", "/api/health", {}, None) == 200:
+                        durations.append(time.perf_counter() - t0)
+                        break
+                except OSError:
+                    time.sleep(0.01)
+            else:
+                sys.exit(f"gunicorn ({profile}) se nije podigao")
+        finally:
+            proc.terminate()
+            proc.wait()
+    durations.sort()
+    return percentile(durations, 50) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--runs", type=int, default=5, help="Broj svežih procesa po profilu (p50).")
+    ap.add_argument("--user", default="synth-0@example.com", help="Korisnik za prvi /api/forecast/ ('' = bez).")
+    ap.add_argument("--gunicorn", action="store_true", help="Meri i gunicorn start do prvog odgovora.")
+    ap.add_argument("--workers", type=int, default=3)
+    ap.add_argument("--max-boot-ms", type=float, help="Pad ako serve profil (uvoz + create_app, p50) pređe ovo.")
+    ap.add_argument("--out", help="Sačuvaj rezultate u JSON.")
+    args = ap.parse_args()
+
+    os.environ.setdefault("ADMISSION_BACKEND", "none")
+    results, failures = {}, []
+    for profile in PROFILES:
+        r = measure(profile, args.user, args.runs)
+        if args.gunicorn:
+            r["gunicorn_ready_ms"] = measure_gunicorn(profile, args.workers, max(1, args.runs // 2))
+        results[profile] = r
+        line = (f"{profile:8s} import={r['import_ms']:7.1f}ms  create_app={r['create_ms']:7.1f}ms  "
+                f"boot={r['boot_ms']:7.1f}ms  prvi odgovor={r['first_response_ms']:6.1f}ms")
+        if "first_forecast_ms" in r:
+            line += f"  prvi forecast={r['first_forecast_ms']:7.1f}ms"
+        if "gunicorn_ready_ms" in r:
+            line += f"  gunicorn={r['gunicorn_ready_ms']:7.1f}ms"
+        print(line)
+
+    serve = results["serve"]
+    if serve["loaded"]:
+        failures.append(f"serve profil pri podizanju uvozi: {', '.join(serve['loaded'])}")
+    if args.max_boot_ms is not None and serve["boot_ms"] > args.max_boot_ms:
+        failures.append(f"serve boot {serve['boot_ms']:.1f}ms > {args.max_boot_ms:.1f}ms")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"runs": args.runs, "profiles": results}, f, indent=2)
+        print(f"rezultati sačuvani u {args.out}")
+    if failures:
+        for msg in failures:
+            print(f"REGRESIJA: {msg}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+# Gunicorn za /api/events (SSE): gevent worker drži hiljade otvorenih stream-ova u jednom procesu.
+# Sync worker-i iz Dockerfile-a bi stream zatvarali posle svakog isporučenog paketa (SSE_STREAMING=auto),
+# pa frontend nginx šalje /api/events/ ovde, a sve ostalo na "backend" (vidi docker-compose.yml).
+#
+#     gunicorn -c gunicorn.events.conf.py "app:create_app('serve')"
+#
+# Stream ne drži DB konekciju ni mesto u obradi (admission STREAM_PATHS) – samo token iz bucket-a
+# pri otvaranju. Događaje objavljuje backend posle commit-a, pa oba servisa moraju imati isti
+# EVENTS_BACKEND=sqlite:///<deljeni volume> (i isti DATABASE_URL / JWT_SECRET_KEY).
+import os
+
+bind = os.getenv("EVENTS_BIND", "0.0.0.0:5001")
+worker_class = "gevent"  # monkey-patch -> events._streaming() bira dug stream
+workers = int(os.getenv("EVENTS_WORKERS", "1"))
+worker_connections = int(os.getenv("EVENTS_WORKER_CONNECTIONS", "1000"))  # otvorenih stream-ova po worker-u
+timeout = 30  # gevent worker šalje heartbeat arbiter-u nezavisno od dugih odgovora
+graceful_timeout = 5  # stream-ovi se prekidaju; browser se vraća sa Last-Event-ID
@@ -0,0 +1,40 @@
+"""composite indexes for list/overview/summary queries
+
+Revision ID: 5c1e7b9d2f40
+Revises: a2bc6b6081e0
+Create Date: 2026-10-18 10:12:03.512840
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e7b9d2f40'
+down_revision = 'a2bc6b6081e0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (user_id, date, id) pokriva i sve upite koji su koristili samo ix_transaction_user_id
+    op.create_index("ix_transaction_user_date_id", "transaction", ["user_id", "date", "id"], unique=False)
+    op.create_index("ix_transaction_user_type_date_cat", "transaction", ["user_id", "type", "date", "category_id"], unique=False)
+    op.drop_index("ix_transaction_user_id", table_name="transaction")
+    # category_id se uvek filtrira uz user_id, a datum je drugi stubac oba složena indeksa
+    op.drop_index("ix_transaction_category_id", table_name="transaction")
+    op.drop_index("ix_transaction_date", table_name="transaction")
+
+    op.create_index("ix_category_user_id", "category", ["user_id"], unique=False)
+    op.create_index("ix_budget_user_month", "budget", ["user_id", "month"], unique=False)
+
+
+def downgrade():
+    op.drop_index("ix_budget_user_month", table_name="budget")
+    op.drop_index("ix_category_user_id", table_name="category")
+
+    op.create_index("ix_transaction_date", "transaction", ["date"], unique=False)
+    op.create_index("ix_transaction_category_id", "transaction", ["category_id"], unique=False)
+    op.create_index("ix_transaction_user_id", "transaction", ["user_id"], unique=False)
+    op.drop_index("ix_transaction_user_type_date_cat", table_name="transaction")
+    op.drop_index("ix_transaction_user_date_id", table_name="transaction")
@@ -0,0 +1,49 @@
+"""monthly_category_total rollup
+
+Revision ID: 8f3a6d21c7b5
+Revises: 5c1e7b9d2f40
+Create Date: 2026-10-18 11:40:27.201394
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3a6d21c7b5'
+down_revision = '5c1e7b9d2f40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    op.create_table('monthly_category_total',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(length=10), nullable=False),
+    sa.Column('total', sa.Numeric(16, 2), nullable=False),
+    sa.Column('tx_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['category.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'month', 'category_id', 'type')
+    )
+
+    # popuni rollup iz postojećih transakcija
+    month_sql = "to_char(date, 'YYYY-MM')" if bind.dialect.name == "postgresql" else "strftime('%Y-%m', date)"
+    bind.execute(
+        sa.text(
+            f"""
+            INSERT INTO monthly_category_total (user_id, month, category_id, type, total, tx_count)
+            SELECT user_id, {month_sql}, category_id, type, SUM(amount), COUNT(*)
+            FROM "transaction"
+            GROUP BY user_id, {month_sql}, category_id, type
+            """
+        )
+    )
+
+
+def downgrade():
+    op.drop_table('monthly_category_total')
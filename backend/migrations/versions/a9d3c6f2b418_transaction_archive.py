@@ -0,0 +1,47 @@
+"""transaction_archive: cold storage for old transactions
+
+Revision ID: a9d3c6f2b418
+Revises: f3b8e1a4c950
+Create Date: 2026-10-18 21:04:12.518243
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d3c6f2b418'
+down_revision = 'f3b8e1a4c950'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('transaction_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(length=10), nullable=False),
+    sa.Column('title', sa.String(length=120), nullable=True),
+    sa.Column('amount_cents', sa.BigInteger(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    sa.Column('note', sa.String(length=255), nullable=True),
+    sa.Column('seq', sa.BigInteger(), nullable=False, server_default='0'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['category.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_transaction_archive_user_date_id', 'transaction_archive', ['user_id', 'date', 'id'], unique=False)
+    op.create_index('ix_transaction_archive_user_seq', 'transaction_archive', ['user_id', 'seq'], unique=False)
+
+
+def downgrade():
+    # arhivirani redovi se vraćaju u transaction (FTS trigeri ih ponovo indeksiraju)
+    op.execute(
+        'INSERT INTO "transaction" (id, user_id, category_id, type, title, amount_cents, date, note, seq, updated_at) '
+        'SELECT id, user_id, category_id, type, title, amount_cents, date, note, seq, updated_at FROM transaction_archive'
+    )
+    op.drop_index('ix_transaction_archive_user_seq', table_name='transaction_archive')
+    op.drop_index('ix_transaction_archive_user_date_id', table_name='transaction_archive')
+    op.drop_table('transaction_archive')
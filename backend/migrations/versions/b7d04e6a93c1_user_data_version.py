@@ -0,0 +1,26 @@
+"""user data_version for response cache / ETag
+
+Revision ID: b7d04e6a93c1
+Revises: 8f3a6d21c7b5
+Create Date: 2026-10-18 13:05:51.770318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d04e6a93c1'
+down_revision = '8f3a6d21c7b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
@@ -0,0 +1,76 @@
+"""transaction full-text search (SQLite FTS5 / Postgres GIN)
+
+Revision ID: d41f8a2c6e97
+Revises: b7d04e6a93c1
+Create Date: 2026-10-18 15:22:48.104562
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f8a2c6e97'
+down_revision = 'b7d04e6a93c1'
+branch_labels = None
+depends_on = None
+
+PG_VECTOR = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(note, ''))"
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name == "sqlite":
+        # external-content FTS5: tekst se ne duplira, trigeri drže indeks u sinhronizaciji
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE transaction_fts USING fts5(
+                title, note,
+                content='transaction', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER transaction_fts_ai AFTER INSERT ON "transaction" BEGIN
+                INSERT INTO transaction_fts(rowid, title, note) VALUES (new.id, new.title, new.note);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER transaction_fts_ad AFTER DELETE ON "transaction" BEGIN
+                INSERT INTO transaction_fts(transaction_fts, rowid, title, note)
+                VALUES ('delete', old.id, old.title, old.note);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER transaction_fts_au AFTER UPDATE OF title, note ON "transaction" BEGIN
+                INSERT INTO transaction_fts(transaction_fts, rowid, title, note)
+                VALUES ('delete', old.id, old.title, old.note);
+                INSERT INTO transaction_fts(rowid, title, note) VALUES (new.id, new.title, new.note);
+            END
+            """
+        )
+        # popuni indeks iz postojećih transakcija
+        op.execute("INSERT INTO transaction_fts(transaction_fts) VALUES ('rebuild')")
+
+    elif bind.dialect.name == "postgresql":
+        op.execute(f'CREATE INDEX ix_transaction_fts ON "transaction" USING GIN ({PG_VECTOR})')
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS transaction_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS transaction_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS transaction_fts_ai")
+        op.execute("DROP TABLE IF EXISTS transaction_fts")
+
+    elif bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_transaction_fts")
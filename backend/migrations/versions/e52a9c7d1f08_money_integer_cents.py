@@ -0,0 +1,115 @@
+"""money as integer cents (amount_cents, limit_cents, total_cents)
+
+Revision ID: e52a9c7d1f08
+Revises: d41f8a2c6e97
+Create Date: 2026-10-18 16:05:12.518230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e52a9c7d1f08'
+down_revision = 'd41f8a2c6e97'
+branch_labels = None
+depends_on = None
+
+# batch režim na SQLite-u pravi tabelu "transaction" iznova, a time nestaju i FTS trigeri
+# iz d41f8a2c6e97 – posle izmene se ponovo kreiraju (FTS indeks ostaje važeći jer se id-jevi ne menjaju)
+FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS transaction_fts_ai AFTER INSERT ON "transaction" BEGIN
+        INSERT INTO transaction_fts(rowid, title, note) VALUES (new.id, new.title, new.note);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transaction_fts_ad AFTER DELETE ON "transaction" BEGIN
+        INSERT INTO transaction_fts(transaction_fts, rowid, title, note)
+        VALUES ('delete', old.id, old.title, old.note);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transaction_fts_au AFTER UPDATE OF title, note ON "transaction" BEGIN
+        INSERT INTO transaction_fts(transaction_fts, rowid, title, note)
+        VALUES ('delete', old.id, old.title, old.note);
+        INSERT INTO transaction_fts(rowid, title, note) VALUES (new.id, new.title, new.note);
+    END
+    """,
+)
+
+
+def _month_sql(bind):
+    return "to_char(date, 'YYYY-MM')" if bind.dialect.name == "postgresql" else "strftime('%Y-%m', date)"
+
+
+def _restore_fts_triggers(bind):
+    if bind.dialect.name == "sqlite":
+        for sql in FTS_TRIGGERS:
+            op.execute(sql)
+
+
+def _refill_rollup(bind, total_col, amount_col):
+    bind.execute(
+        sa.text(
+            f"""
+            INSERT INTO monthly_category_total (user_id, month, category_id, type, {total_col}, tx_count)
+            SELECT user_id, {_month_sql(bind)}, category_id, type, SUM({amount_col}), COUNT(*)
+            FROM "transaction"
+            GROUP BY user_id, {_month_sql(bind)}, category_id, type
+            """
+        )
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # 1) nove kolone (nullable dok se ne popune)
+    op.add_column('transaction', sa.Column('amount_cents', sa.BigInteger(), nullable=True))
+    op.add_column('budget', sa.Column('limit_cents', sa.BigInteger(), nullable=True))
+
+    # 2) konverzija: iznos * 100, zaokruženo na ceo cent
+    bind.execute(sa.text('UPDATE "transaction" SET amount_cents = CAST(ROUND(amount * 100) AS BIGINT)'))
+    bind.execute(sa.text('UPDATE budget SET limit_cents = CAST(ROUND(limit_amount * 100) AS BIGINT)'))
+
+    # 3) stare kolone napolje, nove NOT NULL
+    with op.batch_alter_table('transaction') as batch_op:
+        batch_op.alter_column('amount_cents', existing_type=sa.BigInteger(), nullable=False)
+        batch_op.drop_column('amount')
+    with op.batch_alter_table('budget') as batch_op:
+        batch_op.alter_column('limit_cents', existing_type=sa.BigInteger(), nullable=False)
+        batch_op.drop_column('limit_amount')
+
+    # 4) rollup se ne konvertuje nego ponovo računa iz transakcija – zbirovi su tada tačni u centima
+    bind.execute(sa.text('DELETE FROM monthly_category_total'))
+    with op.batch_alter_table('monthly_category_total') as batch_op:
+        batch_op.drop_column('total')
+        batch_op.add_column(sa.Column('total_cents', sa.BigInteger(), nullable=False, server_default='0'))
+    _refill_rollup(bind, 'total_cents', 'amount_cents')
+
+    _restore_fts_triggers(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    op.add_column('transaction', sa.Column('amount', sa.Numeric(14, 2), nullable=True))
+    op.add_column('budget', sa.Column('limit_amount', sa.Float(), nullable=True))
+    bind.execute(sa.text('UPDATE "transaction" SET amount = amount_cents / 100.0'))
+    bind.execute(sa.text('UPDATE budget SET limit_amount = limit_cents / 100.0'))
+
+    with op.batch_alter_table('transaction') as batch_op:
+        batch_op.alter_column('amount', existing_type=sa.Numeric(14, 2), nullable=False)
+        batch_op.drop_column('amount_cents')
+    with op.batch_alter_table('budget') as batch_op:
+        batch_op.alter_column('limit_amount', existing_type=sa.Float(), nullable=False)
+        batch_op.drop_column('limit_cents')
+
+    bind.execute(sa.text('DELETE FROM monthly_category_total'))
+    with op.batch_alter_table('monthly_category_total') as batch_op:
+        batch_op.drop_column('total_cents')
+        batch_op.add_column(sa.Column('total', sa.Numeric(16, 2), nullable=False, server_default='0'))
+    _refill_rollup(bind, 'total', 'amount')
+
+    _restore_fts_triggers(bind)
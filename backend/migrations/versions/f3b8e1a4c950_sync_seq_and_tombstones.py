@@ -0,0 +1,49 @@
+"""sync: seq/updated_at on transaction, category, budget + tombstone table
+
+Revision ID: f3b8e1a4c950
+Revises: e52a9c7d1f08
+Create Date: 2026-10-18 17:12:40.331907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8e1a4c950'
+down_revision = 'e52a9c7d1f08'
+branch_labels = None
+depends_on = None
+
+TABLES = ('transaction', 'category', 'budget')
+
+
+def upgrade():
+    # ADD COLUMN sa konstantnim default-om – bez prepisivanja tabele (i FTS trigeri ostaju)
+    for t in TABLES:
+        op.add_column(t, sa.Column('seq', sa.BigInteger(), nullable=False, server_default='0'))
+        op.add_column(t, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f'UPDATE "{t}" SET updated_at = CURRENT_TIMESTAMP')
+        op.create_index(f'ix_{t}_user_seq', t, ['user_id', 'seq'], unique=False)
+
+    op.create_table('tombstone',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tombstone_user_seq', 'tombstone', ['user_id', 'seq'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tombstone_user_seq', table_name='tombstone')
+    op.drop_table('tombstone')
+
+    for t in TABLES:
+        op.drop_index(f'ix_{t}_user_seq', table_name=t)
+        op.drop_column(t, 'updated_at')
+        op.drop_column(t, 'seq')
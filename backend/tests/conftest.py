@@ -0,0 +1,13 @@
+"""Zajedničko okruženje testova: Config čita env pri prvom uvozu app paketa, pa se
+promenljive postavljaju ovde, pre nego što pytest uveze ijedan test modul."""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+for name in ("ADMISSION_BACKEND", "EVENTS_BACKEND"):
+    os.environ[name] = "none"  # testovi koji ih proveravaju uključuju ih sami (monkeypatch Config)
+os.environ["RESPONSE_CACHE_BACKEND"] = "none"  # svaka ruta mora stvarno da izvrši upite
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["METRICS_DIR"] = tempfile.mkdtemp()
@@ -0,0 +1,73 @@
+"""Admission control: odbijeni zahtevi se vide u /api/metrics, bucket je po korisniku (ne po obliku tokena)."""
+import pytest
+
+from app import create_app
+from app.config import Config
+
+
+@pytest.fixture
+def limited_app(monkeypatch):
+    monkeypatch.setattr(Config, "ADMISSION_BACKEND", "memory")
+    monkeypatch.setattr(Config, "ADMISSION_MAX_INFLIGHT", 0)
+    monkeypatch.setattr(Config, "RATE_LIMIT_CAPACITY", 2.0)
+    monkeypatch.setattr(Config, "RATE_LIMIT_REFILL", 0.001)
+    return create_app("serve")
+
+
+def test_rejected_requests_are_counted(limited_app):
+    client = limited_app.test_client()
+    statuses = [client.get("/api/categories/").status_code for _ in range(5)]
+    assert statuses[:2] == [401, 401]  # bucket IP-a ima 2 tokena, pa JWT odbija
+    assert statuses[2:] == [429, 429, 429]
+
+    body = client.get("/api/metrics").get_data(as_text=True)
+    assert 'http_requests_total{endpoint="categories.list_categories",method="GET",status="429"} 3' in body
+    assert 'http_requests_total{endpoint="categories.list_categories",method="GET",status="401"} 2' in body
+
+
+def test_email_and_id_tokens_share_one_bucket(monkeypatch, tmp_path):
+    from flask_jwt_extended import create_access_token
+    from app.database import db
+    from app.models import User
+
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'admission.db'}")
+    monkeypatch.setattr(Config, "ADMISSION_BACKEND", "memory")
+    monkeypatch.setattr(Config, "ADMISSION_MAX_INFLIGHT", 0)
+    monkeypatch.setattr(Config, "RATE_LIMIT_CAPACITY", 4.0)
+    monkeypatch.setattr(Config, "RATE_LIMIT_REFILL", 0.001)
+    app = create_app("serve")
+    with app.app_context():
+        db.create_all()
+        user = User(email="bucket@example.com", name="Bucket", password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+        by_id = {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+        by_email = {"Authorization": f"Bearer {create_access_token(identity=user.email)}"}
+
+    client = app.test_client()
+    statuses = [client.get("/api/auth/me", headers=h).status_code for h in (by_id, by_email) * 3]
+    assert statuses == [200, 200, 200, 200, 429, 429]
+
+
+def test_event_stream_does_not_take_inflight_slot(monkeypatch, tmp_path):
+    from flask_jwt_extended import create_access_token
+
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'stream.db'}")
+    monkeypatch.setattr(Config, "ADMISSION_BACKEND", "memory")
+    monkeypatch.setattr(Config, "ADMISSION_MAX_INFLIGHT", 1)
+    monkeypatch.setattr(Config, "EVENTS_BACKEND", "memory")
+    monkeypatch.setattr(Config, "SSE_STREAMING", "never")
+    app = create_app("serve")
+    with app.app_context():
+        from app.database import db
+        db.create_all()
+        headers = {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+    store = app.extensions["admission"]
+    token = store.enter()  # jedino mesto zauzeto (npr. dug zahtev u drugom worker-u)
+    client = app.test_client()
+    try:
+        assert client.get("/api/categories/", headers=headers).status_code == 503
+        assert client.get("/api/events/", headers=headers).status_code == 200
+    finally:
+        store.leave(token)
@@ -0,0 +1,35 @@
+"""Anomalije u prognozi: kategorija sa uvek istim iznosom (std = 0) i dalje prijavljuje odstupanje."""
+from datetime import datetime
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.config import Config
+from app.database import db
+from app.models import Category, Transaction, User
+
+
+def test_outlier_flagged_when_history_has_zero_variance(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'forecast.db'}")
+    app = create_app("serve")
+    with app.app_context():
+        db.create_all()
+        user = User(email="rent@example.com", name="Rent", password_hash="x")
+        db.session.add(user)
+        db.session.flush()
+        rent = Category(user_id=user.id, name="Kirija", type="EXPENSE")
+        db.session.add(rent)
+        db.session.flush()
+        for m in range(1, 11):  # 2025-03 .. 2025-12, svaki mesec isti iznos
+            db.session.add(Transaction(user_id=user.id, category_id=rent.id, type="EXPENSE", title="Kirija",
+                                       amount_cents=5_000_000, date=datetime(2025, m + 2, 1)))
+        db.session.add(Transaction(user_id=user.id, category_id=rent.id, type="EXPENSE", title="Kirija",
+                                   amount_cents=5_000_000, date=datetime(2026, 1, 1)))
+        db.session.add(Transaction(user_id=user.id, category_id=rent.id, type="EXPENSE", title="Dupla kirija",
+                                   amount_cents=10_000_000, date=datetime(2026, 1, 2)))
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+
+    body = app.test_client().get("/api/forecast/?month=2026-01", headers=headers).get_json()
+    assert [a["title"] for a in body["anomalies"]] == ["Dupla kirija"]
+    assert body["anomalies"][0]["category_p95"] == 50000.0
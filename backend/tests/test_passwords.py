@@ -0,0 +1,27 @@
+"""Heširanje lozinki: mesto se ne oslobađa dok proces iz pool-a stvarno ne završi heš."""
+import time
+
+import pytest
+
+from app import create_app, passwords
+from app.slots import FileSlots
+
+
+def test_timed_out_hash_keeps_slot_until_done(monkeypatch, tmp_path):
+    app = create_app("serve")
+    app.config.update(PASSWORD_HASH_SLOTS=1, PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_TIMEOUT=0.05)
+    monkeypatch.setattr(passwords, "_slots", FileSlots(str(tmp_path / "slots"), 1))
+    monkeypatch.setattr(passwords, "_pool", None)
+    with app.app_context():
+        pool = passwords._get_pool()
+        pool.submit(int).result()  # proces pool-a je podignut pre merenja timeout-a
+        with pytest.raises(passwords.HashPoolBusy):
+            passwords._run(time.sleep, 1.0)
+        with pytest.raises(passwords.HashPoolBusy):
+            passwords._run(int)  # prvi heš još traje – mesto je i dalje zauzeto
+
+        deadline = time.monotonic() + 5
+        while passwords._slots._held and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert passwords._run(int) == 0
+        pool.shutdown()
@@ -0,0 +1,52 @@
+"""Regresioni čuvar za indekse: PLAN_CHECK_ROUTES ne smeju da rade full table scan.
+
+Pravi privremenu SQLite bazu kroz migracije (FTS5 tabela i trigeri), puni je malim
+sintetičkim skupom (deo transakcija u transaction_archive) i pokreće
+"flask check-query-plans" nad njom.
+"""
+import os
+from datetime import datetime
+
+import pytest
+from flask_migrate import upgrade
+
+from app import create_app
+from app.archive import archive_transactions
+from app.cli import _SCAN_RE
+from app.database import db
+from app.models import User
+from app.seed import seed_synthetic
+from app.utils import add_months
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), "..", "migrations")
+
+
+@pytest.fixture(scope="module")
+def seeded_app():
+    app = create_app()
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        emails = seed_synthetic(users=2, tx_per_user=400, months=14, batch=500, seed=7, log=lambda *_: None)
+        first = add_months(datetime.utcnow().date(), -12)
+        archive_transactions(datetime(first.year, first.month, 1), batch=100, log=lambda *_: None)
+        uid = db.session.query(User.id).filter_by(email=emails[0]).scalar()
+        db.session.remove()
+    return app, uid
+
+
+@pytest.mark.parametrize("detail, table", [
+    ("SCAN transaction", "transaction"),
+    ("SCAN TABLE transaction", "transaction"),  # SQLite < 3.36
+    ("SCAN transaction USING COVERING INDEX ix_transaction_user_date_id", "transaction"),
+])
+def test_scan_regex_matches_table_name(detail, table):
+    assert _SCAN_RE.match(detail).group(1) == table
+
+
+def test_plan_check_routes_use_indexes(seeded_app):
+    app, uid = seeded_app
+    month = datetime.utcnow().strftime("%Y-%m")
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=["check-query-plans", "--user-id", str(uid), "--month", month])
+    assert result.exit_code == 0, result.output
+    assert "OK" in result.output